@@ -0,0 +1,183 @@
+"""Headless JSON API, compatible with LibreTranslate's ``/translate`` and ``/languages``.
+
+Uses the same backend as the web UI (``engine``), so the resident
+models, the result cache and the worker pool are shared. The server binds
+to ``Config.get_server_bind()``, i.e. localhost unless ARGOS_ALLOW_REMOTE=1.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from config import Config
+from engine import NoPackageError, translate_fanout, translate_many, translator_registry
+from metrics import CONTENT_TYPE, translation_metrics
+from preload import preloader
+from tracing import stage, trace_request
+
+
+class ApiError(Exception):
+    """Client error reported as ``{"error": ...}`` like LibreTranslate does."""
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+async def _read_payload(request: Request) -> dict:
+    """Accept JSON bodies as well as form posts (LibreTranslate clients send both)."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("application/json"):
+        try:
+            payload = await request.json()
+        except ValueError as e:
+            raise ApiError("Invalid JSON body") from e
+        if not isinstance(payload, dict):
+            raise ApiError("Expected a JSON object")
+        return payload
+    form = await request.form()
+    payload: dict = {}
+    for key in form:
+        values = form.getlist(key)
+        payload[key] = values if len(values) > 1 else values[0]
+    return payload
+
+
+def list_languages() -> list[dict]:
+    """Return installed languages with their reachable targets (including pivot routes)."""
+    names = {code: name for name, code in translator_registry.language_map().items()}
+    return [
+        {
+            "code": code,
+            "name": name,
+            "targets": translator_registry.route_targets(code),
+        }
+        for code, name in sorted(names.items())
+    ]
+
+
+def translate_request(payload: dict) -> dict:
+    """Handle a LibreTranslate-style ``/translate`` payload.
+
+    ``target`` may also be a list of codes; ``translatedText`` is then an
+    object with one translation (or list of translations) per target.
+    """
+    q = payload.get("q")
+    source = payload.get("source")
+    target = payload.get("target")
+    if q is None:
+        raise ApiError("Invalid request: missing q parameter")
+    if not source:
+        raise ApiError("Invalid request: missing source parameter")
+    if not target:
+        raise ApiError("Invalid request: missing target parameter")
+    if source == "auto":
+        raise ApiError("Language auto-detection is not supported, please pass a source code")
+
+    batch = isinstance(q, list)
+    texts = q if batch else [q]
+    if not all(isinstance(text, str) for text in texts):
+        raise ApiError("Invalid request: q must be a string or a list of strings")
+    if len(texts) > Config.API_MAX_BATCH:
+        raise ApiError(f"Invalid request: at most {Config.API_MAX_BATCH} texts per request")
+
+    fanout = isinstance(target, list)
+    targets = target if fanout else [target]
+    if not all(isinstance(code, str) and code for code in targets):
+        raise ApiError("Invalid request: target must be a code or a list of codes")
+    codes = set(translator_registry.language_map().values())
+    for code in (source, *targets):
+        if code not in codes:
+            raise ApiError(f"{code} is not supported")
+
+    if fanout:
+        results = {}
+        # Targets run on their own threads, so the trace only sees the fan-out as a whole
+        with stage("fanout"):
+            fanned_out = list(translate_fanout(texts, source, targets))
+        for result in fanned_out:
+            if isinstance(result.error, NoPackageError):
+                raise ApiError(f"No installed language package for {source} -> {result.to_code}")
+            if result.error is not None:
+                raise result.error
+            results[result.to_code] = result.texts if batch else result.texts[0]
+        # In request order, although the targets finish in any order
+        return {"translatedText": {code: results[code] for code in targets}}
+
+    try:
+        translated = translate_many(texts, source, target)
+    except NoPackageError as e:
+        raise ApiError(f"No installed language package for {source} -> {target}") from e
+    return {"translatedText": translated if batch else translated[0]}
+
+
+def traced_translate_request(payload: dict) -> dict:
+    """``translate_request`` with stage timings and profiling (see ``tracing.py``)."""
+    target = payload.get("target")
+    targets = ",".join(map(str, target)) if isinstance(target, list) else str(target or "")
+    with trace_request("api", str(payload.get("source") or ""), targets):
+        return translate_request(payload)
+
+
+def create_api() -> FastAPI:
+    """Build the FastAPI application."""
+    app = FastAPI(title="Cindergrace Argos API")
+
+    @app.exception_handler(ApiError)
+    async def _api_error(_request: Request, exc: ApiError):
+        return JSONResponse({"error": str(exc)}, status_code=exc.status_code)
+
+    @app.get("/languages")
+    async def languages():
+        return await run_in_threadpool(list_languages)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok"}
+
+    @app.get("/ready")
+    async def ready():
+        # 503 until the configured pairs are preloaded, for load balancer checks
+        return JSONResponse(preloader.status(), status_code=200 if preloader.ready else 503)
+
+    if Config.METRICS_ENABLED:
+
+        @app.get("/metrics")
+        async def metrics():
+            body = await run_in_threadpool(translation_metrics.render)
+            return PlainTextResponse(body, media_type=CONTENT_TYPE)
+
+    @app.post("/translate")
+    async def translate(request: Request):
+        payload = await _read_payload(request)
+        return await run_in_threadpool(traced_translate_request, payload)
+
+    return app
+
+
+def run_api_server(
+    background: bool = False, log_level: str = "info"
+) -> threading.Thread | None:
+    """Serve the API on ARGOS_API_PORT, blocking unless ``background`` is set."""
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_api(),
+            host=Config.get_server_bind(),
+            port=Config.API_PORT,
+            log_level=log_level,
+        )
+    )
+    print(f"[api] Serving on http://{Config.get_server_bind()}:{Config.API_PORT}", file=sys.stderr)
+    if not background:
+        server.run()
+        return None
+    # Signal handlers can only be installed from the main thread
+    server.install_signal_handlers = lambda: None
+    thread = threading.Thread(target=server.run, name="argos-api", daemon=True)
+    thread.start()
+    return thread
@@ -1,23 +1,28 @@
+import asyncio
+import shutil
+import tempfile
+import time
 from pathlib import Path
 
-import argostranslate.package
-import argostranslate.translate
 import gradio as gr
 from gradio_i18n import Translate, gettext as _
 
-from cindergrace_common import BaseConfig, SecurityMixin, XDGStateStore, env_bool, env_int
-
-# --- State Management ---
-DEFAULT_STATE = {
-    "disclaimer_accepted": False,
-    "port": 7866,
-    "language": "en",
-}
-
-_store = XDGStateStore(
-    app_name="cindergrace_argos",
-    defaults=DEFAULT_STATE,
-)
+from config import Config
+from config import state_store as _store
+from documents import SUPPORTED_SUFFIXES, translate_file
+from engine import NoPackageError, RouteReport, translate_fanout, translator_registry
+from engine import translate as engine_translate
+from engine import translate_stream as engine_translate_stream
+from live import LiveSession
+from metrics import CONTENT_TYPE, translation_metrics
+from package_downloads import install_packages, retire_package
+from package_index import package_index
+from package_store import package_store
+from preload import preloader
+from result_cache import result_cache
+from startup import process_uptime, startup_timer, warm_imports_in_background
+from tracing import RequestTrace, stage, trace_request
+from worker_pool import get_worker_pool, invalidate_workers
 
 # Path to translations
 TRANSLATIONS_PATH = Path(__file__).parent / "translations" / "ui.yaml"
@@ -66,31 +71,13 @@ def accept_disclaimer(accepted: bool):
     return gr.update(visible=False), gr.update(visible=True)
 
 
-class Config(BaseConfig, SecurityMixin):
-    """Application configuration."""
-    APP_PREFIX = "ARGOS"
-
-    # Server settings
-    PORT = env_int("ARGOS_PORT", 7866)
-    # ARGOS_ALLOW_REMOTE=1 for network access (from SecurityMixin)
-
-    # Package management can be disabled for read-only mode
-    ENABLE_PACKAGE_MANAGEMENT = env_bool("ARGOS_ENABLE_PACKAGES", True)
-
-
-# Helper to get a mapping of language names to codes
+# Helper to get a mapping of language names to codes (cached until packages change)
 def get_language_map():
-    installed_packages = argostranslate.package.get_installed_packages()
-    unique_languages = set()  # To store (name, code) tuples
-    for pkg in installed_packages:
-        unique_languages.add((pkg.from_name, pkg.from_code))
-        unique_languages.add((pkg.to_name, pkg.to_code))
-
-    return dict(unique_languages)
+    return translator_registry.language_map()
 
 
 def get_installed_language_names():
-    return sorted(get_language_map().keys())
+    return translator_registry.language_names()
 
 
 # Argos Translate API compatibility helpers (from_lang vs from_name)
@@ -111,25 +98,210 @@ def get_pkg_lang_code(pkg, direction):
 
 
 # --- Translation Logic ---
+def _route_summary(report):
+    """Markdown line naming the route taken and the latency of each hop."""
+    if report.route is None:
+        return ""
+    return _("route_used").format(route=report.describe())
+
+
+def _trace_summary(trace):
+    """Stage timing table for the debug panel (ARGOS_TRACE)."""
+    return trace.markdown() if Config.TRACE_ENABLED else ""
+
+
 def translate_text(text, from_lang_name, to_lang_name):
     """Perform translation based on selected languages."""
     if not text or not from_lang_name or not to_lang_name:
-        return ""
+        return "", "", ""
     try:
-        lang_map = get_language_map()
-        from_code = lang_map[from_lang_name]
-        to_code = lang_map[to_lang_name]
+        with trace_request("translate") as trace:
+            with stage("language_map"):
+                from_code, to_code = translator_registry.resolve_codes(
+                    from_lang_name, to_lang_name
+                )
+            trace.from_code, trace.to_code = from_code, to_code
+            report = RouteReport()
+            translated = engine_translate(text, from_code, to_code, report)
+        return translated, _route_summary(report), _trace_summary(trace)
+
+    except NoPackageError as e:
+        raise gr.Error(
+            _("no_package_found").format(from_lang=from_lang_name, to_lang=to_lang_name)
+        ) from e
+    except Exception as e:
+        raise gr.Error(str(e)) from e
 
-        # Get translation using the simpler API
-        translation = argostranslate.translate.get_translation_from_codes(from_code, to_code)
 
-        if not translation:
-            raise gr.Error(
-                _("no_package_found").format(from_lang=from_lang_name, to_lang=to_lang_name)
+def translate_text_stream(text, from_lang_name, to_lang_name):
+    """Translate paragraph by paragraph, yielding the text translated so far."""
+    if not text or not from_lang_name or not to_lang_name:
+        yield "", "", ""
+        return
+    # Gradio may run each step of the generator on another thread, so the trace is
+    # activated per paragraph rather than around the whole loop
+    trace = RequestTrace("translate_stream")
+    try:
+        with trace.active():
+            with stage("language_map"):
+                from_code, to_code = translator_registry.resolve_codes(
+                    from_lang_name, to_lang_name
+                )
+            trace.from_code, trace.to_code = from_code, to_code
+            report = RouteReport()
+            chunks = engine_translate_stream(text, from_code, to_code, report)
+        translated = ""
+        while True:
+            with trace.active():
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            translated += chunk
+            yield translated, _route_summary(report), ""
+        trace.finish()
+        yield translated, _route_summary(report), _trace_summary(trace)
+
+    except NoPackageError as e:
+        trace.error = str(e)
+        trace.finish()
+        raise gr.Error(
+            _("no_package_found").format(from_lang=from_lang_name, to_lang=to_lang_name)
+        ) from e
+    except Exception as e:
+        trace.error = str(e)
+        trace.finish()
+        raise gr.Error(str(e)) from e
+
+
+def translate_text_fanout(text, from_lang_name, to_lang_names):
+    """Translate into several languages at once, showing each one as soon as it is done."""
+    if not text or not from_lang_name or not to_lang_names:
+        yield "", ""
+        return
+    lang_map = get_language_map()
+    names = {code: name for name, code in lang_map.items()}
+    try:
+        from_code = lang_map[from_lang_name]
+        to_codes = [lang_map[name] for name in to_lang_names]
+    except KeyError as e:
+        raise gr.Error(
+            _("no_package_found").format(from_lang=from_lang_name, to_lang=", ".join(to_lang_names))
+        ) from e
+
+    done: dict[str, str] = {}
+    for result in translate_fanout([text], from_code, to_codes):
+        if result.error is None:
+            body = result.texts[0]
+        elif isinstance(result.error, NoPackageError):
+            body = _("no_package_found").format(
+                from_lang=from_lang_name, to_lang=names[result.to_code]
             )
+        else:
+            body = str(result.error)
+        done[result.to_code] = f"[{names[result.to_code]}]\n{body}"
+        # Sections in the selected order, each one added when its language finishes
+        output = "\n\n".join(done[code] for code in to_codes if code in done)
+        yield output, _("fanout_progress").format(done=len(done), total=len(to_codes))
+
+
+# The live event runs without a queue slot so debounce waits do not block each other;
+# the translations themselves are held to ARGOS_UI_CONCURRENCY here instead
+_live_translations = asyncio.Semaphore(max(1, Config.UI_CONCURRENCY))
+
+
+async def translate_live(text, from_lang_name, to_lang_name, live, session):
+    """Debounced incremental translation while typing (only changed sentences are translated).
+
+    Every keystroke event waits ARGOS_LIVE_DEBOUNCE_MS; only the last one of a
+    burst translates, the others leave the outputs untouched.
+    """
+    if not live:
+        return gr.skip(), gr.skip()
+    revision = session.submit()
+    await asyncio.sleep(Config.LIVE_DEBOUNCE_MS / 1000)
+    if not session.is_latest(revision):
+        return gr.skip(), gr.skip()
+    if not text or not from_lang_name or not to_lang_name:
+        return "", ""
+    try:
+        from_code, to_code = translator_registry.resolve_codes(from_lang_name, to_lang_name)
+        async with _live_translations:
+            # A newer keystroke may have arrived while waiting for a slot
+            if not session.is_latest(revision):
+                return gr.skip(), gr.skip()
+            update = await asyncio.to_thread(session.update, text, from_code, to_code, revision)
+    except NoPackageError as e:
+        raise gr.Error(
+            _("no_package_found").format(from_lang=from_lang_name, to_lang=to_lang_name)
+        ) from e
+    except Exception as e:
+        raise gr.Error(str(e)) from e
+    if update is None:
+        return gr.skip(), gr.skip()
+    stats = _("live_stats").format(
+        translated=update.translated,
+        sentences=update.sentences,
+        reused=update.reused,
+        seconds=update.seconds,
+    )
+    route = _route_summary(update.report)
+    return update.text, f"{route}  \n{stats}" if route else stats
+
+
+# Translated documents, one subdirectory per upload. Gradio serves its own copy of each,
+# so outputs older than an hour are removed on a later upload and the rest at exit.
+_DOCUMENT_OUTPUTS = tempfile.TemporaryDirectory(prefix="argos-documents-")
+_DOCUMENT_OUTPUT_MAX_AGE = 3600
+
+
+def _document_output_dir() -> Path:
+    root = Path(_DOCUMENT_OUTPUTS.name)
+    cutoff = time.time() - _DOCUMENT_OUTPUT_MAX_AGE
+    for entry in root.iterdir():
+        try:
+            if entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
+        except OSError:
+            continue
+    return Path(tempfile.mkdtemp(dir=root))
+
+
+def translate_document_file(
+    file_path, from_lang_name, to_lang_name, field, progress=gr.Progress()  # noqa: B008
+):
+    """Translate an uploaded file and return the translated file plus a throughput summary."""
+    if not file_path:
+        raise gr.Error(_("no_file_selected"))
+    if not from_lang_name or not to_lang_name:
+        raise gr.Error(_("select_languages"))
+    progress(0, desc="Starting translation...")
+    try:
+        from_code, to_code = translator_registry.resolve_codes(from_lang_name, to_lang_name)
+        src = Path(file_path)
+        dst = _document_output_dir() / f"{src.stem}.{to_code}{src.suffix}"
 
-        return translation.translate(text)
+        def on_progress(report):
+            fraction = report.bytes_read / report.total_bytes if report.total_bytes else 0
+            progress(
+                min(fraction, 1.0),
+                desc=f"{report.records} records, {report.chars_per_second:.0f} chars/s",
+            )
+
+        report = translate_file(
+            src, dst, from_code, to_code, field=(field or "text").strip(), on_progress=on_progress
+        )
+        summary = _("document_done").format(
+            records=report.records,
+            chars=report.characters,
+            seconds=report.seconds,
+            rate=report.chars_per_second,
+        )
+        return str(dst), summary
 
+    except NoPackageError as e:
+        raise gr.Error(
+            _("no_package_found").format(from_lang=from_lang_name, to_lang=to_lang_name)
+        ) from e
     except Exception as e:
         raise gr.Error(str(e)) from e
 
@@ -138,9 +310,9 @@ def translate_text(text, from_lang_name, to_lang_name):
 def get_all_packages_status():
     """Return a list of all available packages and their installation status."""
     try:
-        argostranslate.package.update_package_index()
-        available = argostranslate.package.get_available_packages()
-        installed = argostranslate.package.get_installed_packages()
+        # Cached index copy; a stale one is refreshed in the background
+        available = package_index.available_packages()
+        installed = translator_registry.installed_packages()
         installed_codes = {
             (get_pkg_lang_code(p, "from"), get_pkg_lang_code(p, "to")) for p in installed
         }
@@ -154,6 +326,10 @@ def get_all_packages_status():
             name = f"{from_name} -> {to_name}"
             status[name] = (from_code, to_code) in installed_codes
 
+        # Installed packages are always listed, even without any index copy
+        for pkg in installed:
+            status[f"{get_pkg_lang_name(pkg, 'from')} -> {get_pkg_lang_name(pkg, 'to')}"] = True
+
         # Ensure default packages are in the list if index is stale
         if "Englisch -> Deutsch" not in status:
             status["Englisch -> Deutsch"] = ("en", "de") in installed_codes
@@ -166,13 +342,18 @@ def get_all_packages_status():
         return {"Englisch -> Deutsch": True, "Deutsch -> Englisch": True}  # Fallback
 
 
+def _drop_cached_results(pkg):
+    """Forget cached translations for a package that was (re)installed or removed."""
+    if result_cache is not None:
+        result_cache.drop_pair(get_pkg_lang_code(pkg, "from"), get_pkg_lang_code(pkg, "to"))
+
+
 def update_languages(packages_to_install_names, progress=gr.Progress(track_tqdm=True)):  # noqa: B008
     """Install and uninstall language packages based on selection."""
     progress(0, desc="Starting update...")
 
-    # Get all available packages
-    argostranslate.package.update_package_index()
-    available_packages = argostranslate.package.get_available_packages()
+    # Get all available packages (local index copy, no network round trip)
+    available_packages = package_index.available_packages()
 
     # Map names to package objects
     name_to_pkg = {
@@ -181,7 +362,7 @@ def update_languages(packages_to_install_names, progress=gr.Progress(track_tqdm=
     }
 
     # Get currently installed packages
-    installed_packages = argostranslate.package.get_installed_packages()
+    installed_packages = translator_registry.installed_packages()
     installed_names = {
         f"{get_pkg_lang_name(p, 'from')} -> {get_pkg_lang_name(p, 'to')}": p
         for p in installed_packages
@@ -200,6 +381,9 @@ def update_languages(packages_to_install_names, progress=gr.Progress(track_tqdm=
         not in packages_to_install_names
     }
 
+    if Config.OFFLINE and not all(package_store.available_offline(p) for p in packages_to_install):
+        raise gr.Error(_("offline_install_disabled"))
+
     total_ops = len(packages_to_install) + len(packages_to_uninstall)
     if total_ops == 0:
         yield (
@@ -207,37 +391,68 @@ def update_languages(packages_to_install_names, progress=gr.Progress(track_tqdm=
             get_checkbox_group_update(),
             get_source_dropdown_update(),
             get_target_dropdown_update(),
+            get_source_dropdown_update(),
+            get_target_dropdown_update(),
+            get_fanout_dropdown_update(),
         )
         return
 
     op_count = 0
+    failed: list[str] = []
 
-    # Uninstall
-    if packages_to_uninstall:
-        for pkg in progress.tqdm(packages_to_uninstall, desc="Uninstalling packages"):
-            op_count += 1
-            progress(
-                op_count / total_ops,
-                desc=f"Uninstalling {get_pkg_lang_name(pkg, 'from')} -> {get_pkg_lang_name(pkg, 'to')}",
-            )
-            argostranslate.package.uninstall(pkg)
+    def package_swapped(pkg):
+        # New requests load the new package set; in-flight ones keep their models
+        translator_registry.invalidate()
+        invalidate_workers()
+        _drop_cached_results(pkg)
 
-    # Install
-    if packages_to_install:
-        for pkg in progress.tqdm(packages_to_install, desc="Installing packages"):
-            op_count += 1
-            progress(
-                op_count / total_ops,
-                desc=f"Installing {get_pkg_lang_name(pkg, 'from')} -> {get_pkg_lang_name(pkg, 'to')}",
-            )
-            argostranslate.package.install_from_path(pkg.download())
+    def ui_updates(status):
+        return (
+            status,
+            get_checkbox_group_update(),
+            get_source_dropdown_update(),
+            get_target_dropdown_update(),
+            get_source_dropdown_update(),
+            get_target_dropdown_update(),
+            get_fanout_dropdown_update(),
+        )
 
-    yield (
-        _("packages_updated"),
-        get_checkbox_group_update(),
-        get_source_dropdown_update(),
-        get_target_dropdown_update(),
-    )
+    try:
+        # Uninstall: each package leaves the package directory in one rename
+        for pkg in packages_to_uninstall:
+            op_count += 1
+            name = f"{get_pkg_lang_name(pkg, 'from')} -> {get_pkg_lang_name(pkg, 'to')}"
+            progress(op_count / total_ops, desc=f"Uninstalling {name}")
+            retire_package(pkg.package_path)
+            package_swapped(pkg)
+            yield ui_updates(_("packages_progress").format(done=op_count, total=total_ops))
+
+        # Install: downloads and extraction run in parallel, each package goes live on its own
+        if packages_to_install:
+            progress(op_count / total_ops, desc="Downloading packages")
+            for event in install_packages(packages_to_install):
+                name = f"{get_pkg_lang_name(event.pkg, 'from')} -> {get_pkg_lang_name(event.pkg, 'to')}"
+                if event.stage == "downloaded":
+                    progress(op_count / total_ops, desc=f"Installing {name}")
+                    continue
+                op_count += 1
+                if event.stage == "failed":
+                    failed.append(name)
+                else:
+                    package_swapped(event.pkg)
+                    yield ui_updates(_("packages_progress").format(done=op_count, total=total_ops))
+                progress(op_count / total_ops, desc=f"Installed {op_count} of {total_ops}")
+    finally:
+        # Resident translators and the language map are stale now, even after a partial update
+        translator_registry.invalidate()
+        invalidate_workers()
+        # Reload the configured pairs from the new package set
+        preloader.start()
+
+    status_message = _("packages_updated")
+    if failed:
+        status_message = _("packages_failed").format(packages=", ".join(failed))
+    yield ui_updates(status_message)
 
 
 def get_checkbox_group_update():
@@ -249,6 +464,15 @@ def get_checkbox_group_update():
     )
 
 
+def load_package_checkboxes():
+    """Initial package list, read from the cached index when the page loads."""
+    status = get_all_packages_status()
+    return gr.CheckboxGroup(
+        choices=sorted(status.keys()),
+        value=[name for name, installed in status.items() if installed],
+    )
+
+
 def get_source_dropdown_update():
     """Update for source language dropdown."""
     installed_langs = get_installed_language_names()
@@ -260,6 +484,11 @@ def get_source_dropdown_update():
     return gr.Dropdown(choices=installed_langs, value=default, label=_("source_language"))
 
 
+def get_fanout_dropdown_update():
+    """Update for the multi-target dropdown (keeps the selection)."""
+    return gr.Dropdown(choices=get_installed_language_names(), label=_("fanout_targets"))
+
+
 def get_target_dropdown_update():
     """Update for target language dropdown."""
     installed_langs = get_installed_language_names()
@@ -365,11 +594,11 @@ custom_css = """
 """
 
 
-def _get_tab_labels(lang_code: str) -> tuple[str, str, str]:
+def _get_tab_labels(lang_code: str) -> tuple[str, str, str, str]:
     """Get localized tab labels based on saved language."""
     if lang_code == "de":
-        return "Uebersetzen", "Sprachen verwalten", "Einstellungen"
-    return "Translate", "Manage Languages", "Settings"
+        return "Uebersetzen", "Dokumente", "Sprachen verwalten", "Einstellungen"
+    return "Translate", "Documents", "Manage Languages", "Settings"
 
 
 def build_app():
@@ -377,9 +606,13 @@ def build_app():
     # Load saved language preference (default: English)
     state = _store.load()
     saved_lang = state.get("language", "en")
-    tab_translate, tab_languages, tab_settings = _get_tab_labels(saved_lang)
+    tab_translate, tab_documents, tab_languages, tab_settings = _get_tab_labels(saved_lang)
+    # One scan of the installed packages for all dropdowns
+    with startup_timer.phase("build UI: scan installed packages"):
+        language_names = get_installed_language_names()
 
-    with gr.Blocks(title="Cindergrace Argos") as demo:
+    # Gradio's copies of uploads and translated documents are deleted after an hour
+    with gr.Blocks(title="Cindergrace Argos", delete_cache=(3600, 3600)) as demo:
         with Translate(
             str(TRANSLATIONS_PATH), placeholder_langs=["en", "de"]
         ) as lang:
@@ -415,12 +648,8 @@ def build_app():
                         with gr.Row(elem_classes=["cg-translate-row", "cg-card"]):
                             with gr.Column():
                                 from_lang = gr.Dropdown(
-                                    get_installed_language_names(),
-                                    value=(
-                                        "Englisch"
-                                        if "Englisch" in get_installed_language_names()
-                                        else None
-                                    ),
+                                    language_names,
+                                    value="Englisch" if "Englisch" in language_names else None,
                                     label=_("source_language"),
                                 )
                                 source_text = gr.Textbox(
@@ -431,12 +660,8 @@ def build_app():
                                 )
                             with gr.Column():
                                 to_lang = gr.Dropdown(
-                                    get_installed_language_names(),
-                                    value=(
-                                        "Deutsch"
-                                        if "Deutsch" in get_installed_language_names()
-                                        else None
-                                    ),
+                                    language_names,
+                                    value="Deutsch" if "Deutsch" in language_names else None,
                                     label=_("target_language"),
                                 )
                                 translated_text = gr.Textbox(
@@ -446,37 +671,114 @@ def build_app():
                                     elem_classes=["cg-textarea"],
                                 )
 
-                        translate_btn = gr.Button(_("translate_btn"), variant="primary")
+                        with gr.Row():
+                            translate_btn = gr.Button(_("translate_btn"), variant="primary")
+                            live_mode = gr.Checkbox(
+                                value=Config.LIVE_TRANSLATION, label=_("live_translation")
+                            )
+                        route_info = gr.Markdown()
+                        with gr.Accordion(
+                            _("debug_panel"), open=False, visible=Config.TRACE_ENABLED
+                        ):
+                            trace_info = gr.Markdown()
+                        live_session = gr.State(LiveSession())
                         translate_btn.click(
-                            translate_text,
+                            translate_text_stream if Config.STREAM_TRANSLATION else translate_text,
                             inputs=[source_text, from_lang, to_lang],
-                            outputs=translated_text,
+                            outputs=[translated_text, route_info, trace_info],
+                        )
+                        # Every keystroke reaches the server so the last one can win the debounce;
+                        # waiting handlers only sleep, so they need no concurrency slot (the
+                        # translation itself is bounded by _live_translations)
+                        source_text.input(
+                            translate_live,
+                            inputs=[source_text, from_lang, to_lang, live_mode, live_session],
+                            outputs=[translated_text, route_info],
+                            trigger_mode="multiple",
+                            concurrency_limit=None,
+                            show_progress="hidden",
+                        )
+
+                        with gr.Accordion(_("fanout_title"), open=False):
+                            fanout_targets = gr.Dropdown(
+                                language_names,
+                                value=[],
+                                multiselect=True,
+                                label=_("fanout_targets"),
+                            )
+                            fanout_btn = gr.Button(_("fanout_btn"))
+                            fanout_status = gr.Markdown()
+                            fanout_text = gr.Textbox(
+                                lines=12,
+                                label=_("translation"),
+                                interactive=False,
+                                elem_classes=["cg-textarea"],
+                            )
+                        fanout_btn.click(
+                            translate_text_fanout,
+                            inputs=[source_text, from_lang, fanout_targets],
+                            outputs=[fanout_text, fanout_status],
+                        )
+
+                    with gr.TabItem(tab_documents):
+                        with gr.Row(elem_classes=["cg-translate-row", "cg-card"]):
+                            with gr.Column():
+                                doc_from_lang = gr.Dropdown(
+                                    language_names,
+                                    value="Englisch" if "Englisch" in language_names else None,
+                                    label=_("source_language"),
+                                )
+                                doc_file = gr.File(
+                                    label=_("document_file"),
+                                    file_types=list(SUPPORTED_SUFFIXES),
+                                    type="filepath",
+                                )
+                                doc_field = gr.Textbox(
+                                    value="text",
+                                    label=_("document_field"),
+                                    info=_("document_field_info"),
+                                )
+                            with gr.Column():
+                                doc_to_lang = gr.Dropdown(
+                                    language_names,
+                                    value="Deutsch" if "Deutsch" in language_names else None,
+                                    label=_("target_language"),
+                                )
+                                doc_result = gr.File(label=_("translated_file"), interactive=False)
+                                doc_status = gr.Markdown()
+
+                        doc_btn = gr.Button(_("translate_document_btn"), variant="primary")
+                        doc_btn.click(
+                            translate_document_file,
+                            inputs=[doc_file, doc_from_lang, doc_to_lang, doc_field],
+                            outputs=[doc_result, doc_status],
                         )
 
                     with gr.TabItem(tab_languages):
                         status_label = gr.Label(_("packages_status_default"))
 
-                        # Initial state
-                        packages_status = get_all_packages_status()
-                        all_package_names = sorted(packages_status.keys())
-                        installed_package_names = [
-                            name for name, installed in packages_status.items() if installed
-                        ]
-
+                        # Filled on page load, so startup does not parse the package index
                         with gr.Column(elem_classes=["cg-card"]):
                             package_checkboxes = gr.CheckboxGroup(
-                                choices=all_package_names,
-                                value=installed_package_names,
                                 label=_("language_packages_label"),
                                 info=_("language_packages_info"),
                             )
+                        demo.load(load_package_checkboxes, outputs=package_checkboxes)
 
                         update_btn = gr.Button(_("update_packages_btn"), variant="primary")
 
                         update_btn.click(
                             update_languages,
                             inputs=[package_checkboxes],
-                            outputs=[status_label, package_checkboxes, from_lang, to_lang],
+                            outputs=[
+                                status_label,
+                                package_checkboxes,
+                                from_lang,
+                                to_lang,
+                                doc_from_lang,
+                                doc_to_lang,
+                                fanout_targets,
+                            ],
                         )
 
                     with gr.TabItem(tab_settings):
@@ -527,21 +829,67 @@ def build_app():
                 outputs=[disclaimer_section, main_section],
             )
 
+    demo.queue(default_concurrency_limit=Config.UI_CONCURRENCY)
     return demo
 
 
+def readiness():
+    """Load balancer readiness check: 503 until the ARGOS_PRELOAD pairs are warm."""
+    from fastapi.responses import JSONResponse
+
+    return JSONResponse(preloader.status(), status_code=200 if preloader.ready else 503)
+
+
+def metrics_endpoint():
+    """Prometheus scrape endpoint (ARGOS_METRICS)."""
+    from fastapi.responses import PlainTextResponse
+
+    return PlainTextResponse(translation_metrics.render(), media_type=CONTENT_TYPE)
+
+
 def main():
     """Main entry point."""
+    uptime = process_uptime()
+    if uptime is not None:
+        startup_timer.record("interpreter and imports", uptime)
     # Port: ENV var > State > Default
     port = Config.get_port(state_store=_store, default=7866)
-    demo = build_app()
-    demo.launch(
-        server_name=Config.get_server_bind(),
-        server_port=port,
-        share=False,
-        theme=gr.themes.Soft(),
-        css=custom_css,
-    )
+    # Start translation workers before the first request (no-op unless ARGOS_WORKERS > 0)
+    with startup_timer.phase("start worker pool"):
+        get_worker_pool()
+    # Load and warm up ARGOS_PRELOAD pairs while the server starts
+    preloader.start()
+    # Refresh a stale package index without delaying startup
+    package_index.refresh_in_background()
+    if Config.API_ENABLED:
+        from api import run_api_server
+
+        if not Config.UI_ENABLED:
+            # Headless mode: only the JSON API
+            startup_timer.report()
+            warm_imports_in_background()
+            run_api_server()
+            return
+        with startup_timer.phase("start API server"):
+            run_api_server(background=True)
+    with startup_timer.phase("build UI"):
+        demo = build_app()
+    with startup_timer.phase("launch server"):
+        demo.launch(
+            server_name=Config.get_server_bind(),
+            server_port=port,
+            share=False,
+            theme=gr.themes.Soft(),
+            css=custom_css,
+            prevent_thread_lock=True,
+        )
+    demo.app.add_api_route("/ready", readiness, methods=["GET"])
+    if Config.METRICS_ENABLED:
+        demo.app.add_api_route("/metrics", metrics_endpoint, methods=["GET"])
+    startup_timer.report()
+    # Pairs outside ARGOS_PRELOAD load on first use; import their runtime off the request path
+    warm_imports_in_background()
+    demo.block_thread()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,191 @@
+"""Find the fastest inference settings for this machine.
+
+``cindergrace-argos autotune`` loads one installed pair's model with each
+combination of compute type, thread counts and (optionally) beam size,
+translates a fixed sample corpus from ``benchmark.py`` through the batched
+engine path and saves the fastest combination to the state file, globally
+or for the pair alone. The current settings are always measured too, so
+saving never makes the machine slower on the sample.
+"""
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, replace
+from pathlib import Path
+
+from benchmark import CORPORA, build_corpus
+from tuning import COMPUTE_TYPES, InferenceSettings
+
+
+def _int_list(spec: str) -> list[int]:
+    return sorted({int(item) for item in spec.split(",") if item.strip()})
+
+
+def default_thread_counts() -> str:
+    cpus = os.cpu_count() or 1
+    return ",".join(str(n) for n in sorted({1, max(1, cpus // 2), cpus}))
+
+
+def candidates(
+    current: InferenceSettings,
+    compute_types: list[str],
+    inter_threads: list[int],
+    intra_threads: list[int],
+    beam_sizes: list[int],
+) -> list[InferenceSettings]:
+    """The current settings first, then every combination not equal to them."""
+    combos = [current]
+    for compute_type, inter, intra, beam in itertools.product(
+        compute_types, inter_threads, intra_threads, beam_sizes
+    ):
+        settings = replace(
+            current,
+            compute_type=compute_type,
+            inter_threads=inter,
+            intra_threads=intra,
+            beam_size=beam,
+        )
+        if settings not in combos:
+            combos.append(settings)
+    return combos
+
+
+def measure(texts: list[str], from_code: str, to_code: str) -> tuple[float, int]:
+    """Translate ``texts`` once as a warmup, then time it; returns (seconds, sentences)."""
+    import engine
+
+    engine.translate_documents(texts[:1], from_code, to_code, use_cache=False)
+    start = time.perf_counter()
+    _outputs, report = engine.translate_documents(texts, from_code, to_code, use_cache=False)
+    return time.perf_counter() - start, report.sentences
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="cindergrace-argos autotune",
+        description="Benchmark inference settings on this machine and save the fastest.",
+    )
+    parser.add_argument("--from", dest="from_code", default="en", help="Source code (default: en)")
+    parser.add_argument("--to", dest="to_code", default="de", help="Target code (default: de)")
+    parser.add_argument(
+        "--corpus", choices=list(CORPORA), default="medium", help="Sample corpus (default: medium)"
+    )
+    parser.add_argument(
+        "--compute-types",
+        default="int8,float32",
+        help="Comma-separated compute types to try (default: int8,float32)",
+    )
+    parser.add_argument(
+        "--inter-threads", help="Comma-separated inter_threads values (default: current)"
+    )
+    parser.add_argument(
+        "--intra-threads",
+        default=default_thread_counts(),
+        help="Comma-separated intra_threads values (default: 1, half and all cores)",
+    )
+    parser.add_argument(
+        "--beam-sizes",
+        help="Comma-separated beam sizes (default: current; smaller beams trade quality for speed)",
+    )
+    parser.add_argument(
+        "--per-pair",
+        action="store_true",
+        help="Save the result for this pair only instead of as the global default",
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Measure but do not save")
+    parser.add_argument("--output", type=Path, help="Write the JSON results to this file")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    """Run the autotuner; returns the process exit code."""
+    args = parse_args(argv)
+
+    from config import Config
+
+    # Models are loaded in this process, on the path that uses the decoding options
+    Config.WORKERS = 0
+    Config.BATCHED_TRANSLATION = True
+
+    import engine
+    from tuning import inference_tuning
+
+    engine.result_cache = None
+    pair = (args.from_code, args.to_code)
+    if pair not in engine.translator_registry.installed_pairs():
+        print(
+            f"error: no installed package for {args.from_code} -> {args.to_code}", file=sys.stderr
+        )
+        return 2
+
+    current = inference_tuning.settings(*pair)
+    try:
+        compute_types = [item.strip() for item in args.compute_types.split(",") if item.strip()]
+        unknown = [item for item in compute_types if item not in COMPUTE_TYPES]
+        if unknown:
+            raise ValueError(f"unknown compute type: {', '.join(unknown)}")
+        inter = _int_list(args.inter_threads) if args.inter_threads else [current.inter_threads]
+        intra = _int_list(args.intra_threads)
+        beams = _int_list(args.beam_sizes) if args.beam_sizes else [current.beam_size]
+        if min(inter + beams) < 1 or min(intra) < 0:
+            raise ValueError("thread counts and beam sizes must be positive")
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    texts = build_corpus(args.corpus)
+    measured: list[tuple[InferenceSettings, float]] = []
+    results = []
+    for settings in candidates(current, compute_types, inter, intra, beams):
+        with inference_tuning.override(settings):
+            # Reload the model so the compute type and thread counts apply
+            engine.translator_registry.invalidate()
+            try:
+                seconds, sentences = measure(texts, *pair)
+            except Exception as e:
+                # e.g. a compute type the device does not support
+                print(f"[autotune] {settings}: failed: {e}", file=sys.stderr)
+                continue
+        rate = round(sentences / seconds, 1) if seconds else 0.0
+        measured.append((settings, rate))
+        results.append(
+            {**asdict(settings), "seconds": round(seconds, 3), "sentences_per_second": rate}
+        )
+        print(f"[autotune] {settings}: {rate:8.1f} sentences/s", file=sys.stderr)
+    engine.translator_registry.invalidate()
+
+    if not measured:
+        print("error: no settings could be measured", file=sys.stderr)
+        return 1
+    best, best_rate = max(measured, key=lambda item: item[1])
+    baseline = dict(measured).get(current)
+    print(
+        f"[autotune] fastest: {best}, {best_rate} sentences/s "
+        f"(current settings: {baseline if baseline is not None else 'failed'})",
+        file=sys.stderr,
+    )
+    scope = f"{args.from_code}:{args.to_code}" if args.per_pair else None
+    if not args.dry_run:
+        inference_tuning.save(best, scope)
+        print(f"[autotune] saved for {scope or 'all pairs'}", file=sys.stderr)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "pair": f"{args.from_code}->{args.to_code}",
+        "corpus": args.corpus,
+        "cpus": os.cpu_count(),
+        "results": results,
+        "best": asdict(best),
+        "saved": None if args.dry_run else (scope or "global"),
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+    return 0
@@ -0,0 +1,300 @@
+"""Reproducible translation benchmark.
+
+``cindergrace-argos bench`` translates fixed short, medium and long corpora
+through the same engine path the Translate tab uses (name resolution plus
+``engine.translate``) and reports p50/p95 latency, sentences per second and
+peak RSS as JSON. ``--stub`` replaces the models with a trivial translator,
+so the app's own overhead can be measured on any machine without packages.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import platform
+import random
+import resource
+import sys
+import time
+from dataclasses import asdict, dataclass
+from importlib import metadata
+from pathlib import Path
+
+# Fixed source sentences; corpora are drawn from them with a fixed seed
+SENTENCES = [
+    "The weather today is pleasant and the streets are quiet.",
+    "Please send me the quarterly report before Friday.",
+    "Our team has finished the migration to the new servers.",
+    "The museum opens at nine o'clock in the morning.",
+    "He forgot his umbrella on the train again.",
+    "Fresh vegetables are delivered to the market every Tuesday.",
+    "The software update fixes several security issues.",
+    "Could you explain how the new billing process works?",
+    "The children were playing football in the park until sunset.",
+    "We recommend restarting the application after the installation.",
+    "The conference will take place in the main hall.",
+    "She has been learning to play the piano for three years.",
+    "All passengers must show a valid ticket on request.",
+    "The recipe calls for two eggs, flour and a pinch of salt.",
+    "Thank you for your patience while we resolve the issue.",
+    "The river flooded the lower part of the village last spring.",
+    "Remember to back up your files regularly.",
+    "The library has extended its opening hours during the exam period.",
+    "Prices may change without prior notice.",
+    "The hiking trail is closed because of fallen trees.",
+    "Our office will be closed on public holidays.",
+    "The new bridge reduced the travel time by twenty minutes.",
+    "Please do not hesitate to contact us if you have any questions.",
+    "The results of the survey will be published next month.",
+]
+
+# name: (documents, paragraphs per document, sentences per paragraph)
+CORPORA = {
+    "short": (200, 1, 1),
+    "medium": (40, 1, 8),
+    "long": (8, 10, 8),
+}
+SEED = 20240601
+
+
+@dataclass
+class CorpusResult:
+    """Latency and throughput of one corpus."""
+
+    documents: int
+    sentences: int
+    characters: int
+    seconds: float
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+    sentences_per_second: float
+    chars_per_second: float
+
+
+def build_corpus(name: str, seed: int = SEED) -> list[str]:
+    """Return the fixed documents of a corpus; identical on every run."""
+    documents, paragraphs, sentences = CORPORA[name]
+    rng = random.Random(f"{seed}:{name}")
+    return [
+        "\n\n".join(
+            " ".join(rng.choice(SENTENCES) for _ in range(sentences)) for _ in range(paragraphs)
+        )
+        for _ in range(documents)
+    ]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of ``values`` (0 < q <= 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process or its largest reaped child, in MiB.
+
+    Worker processes only count once they have exited and been joined, so shut
+    the worker pool down before measuring.
+    """
+    scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is bytes on macOS, KiB elsewhere
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return round(max(own, children) * scale / (1024 * 1024), 1)
+
+
+class StubTranslation:
+    """Model-free translation that tags the text and optionally sleeps per sentence."""
+
+    def __init__(self, from_code: str, to_code: str, delay: float = 0.0):
+        self.prefix = f"[{from_code}>{to_code}] "
+        self.delay = delay
+
+    def translate(self, text: str) -> str:
+        if self.delay:
+            # Roughly one model call per sentence
+            time.sleep(self.delay * max(1, text.count(". ") + 1))
+        return self.prefix + text
+
+
+STUB_LANGUAGES = {"English": "en", "German": "de", "French": "fr"}
+
+
+def install_stub_translator(delay: float = 0.0) -> None:
+    """Serve en<->de and en<->fr from ``StubTranslation`` instead of installed packages."""
+    from engine import translator_registry
+
+    pairs = [("en", "de"), ("de", "en"), ("en", "fr"), ("fr", "en")]
+    translator_registry.use_translations(
+        {pair: StubTranslation(*pair, delay=delay) for pair in pairs}, STUB_LANGUAGES
+    )
+
+
+def _versions() -> dict[str, str]:
+    versions = {"python": platform.python_version()}
+    for dist in ("cindergrace-argos", "argostranslate", "ctranslate2"):
+        try:
+            versions[dist] = metadata.version(dist)
+        except metadata.PackageNotFoundError:
+            versions[dist] = "not installed"
+    return versions
+
+
+def run_corpus(texts: list[str], from_name: str, to_name: str) -> CorpusResult:
+    """Translate each document like the Translate tab does and time it."""
+    import engine
+    from segmentation import segment_text
+
+    latencies = []
+    start = time.perf_counter()
+    for text in texts:
+        t0 = time.perf_counter()
+        from_code, to_code = engine.translator_registry.resolve_codes(from_name, to_name)
+        engine.translate(text, from_code, to_code)
+        latencies.append(time.perf_counter() - t0)
+    seconds = time.perf_counter() - start
+    sentences = sum(
+        1 for text in texts for segment in segment_text(text) if segment.translatable
+    )
+    characters = sum(len(text) for text in texts)
+    return CorpusResult(
+        documents=len(texts),
+        sentences=sentences,
+        characters=characters,
+        seconds=round(seconds, 4),
+        p50_ms=round(percentile(latencies, 50) * 1000, 3),
+        p95_ms=round(percentile(latencies, 95) * 1000, 3),
+        mean_ms=round(sum(latencies) / len(latencies) * 1000, 3),
+        sentences_per_second=round(sentences / seconds, 1) if seconds else 0.0,
+        chars_per_second=round(characters / seconds, 1) if seconds else 0.0,
+    )
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    """Human-readable per-corpus changes against a previous results file."""
+    lines = []
+    for name, current in results["corpora"].items():
+        previous = baseline.get("corpora", {}).get(name)
+        if not previous:
+            continue
+        for key in ("p50_ms", "p95_ms", "sentences_per_second"):
+            old, new = previous[key], current[key]
+            change = (new - old) / old * 100 if old else 0.0
+            lines.append(f"{name:<7} {key:<21} {old:>10} -> {new:>10} ({change:+.1f}%)")
+    old_rss, new_rss = baseline.get("peak_rss_mb"), results["peak_rss_mb"]
+    if old_rss:
+        lines.append(f"{'all':<7} {'peak_rss_mb':<21} {old_rss:>10} -> {new_rss:>10}")
+    return lines
+
+
+def parse_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="cindergrace-argos bench",
+        description="Benchmark translation latency and throughput on fixed corpora.",
+    )
+    parser.add_argument("--from", dest="from_code", default="en", help="Source code (default: en)")
+    parser.add_argument("--to", dest="to_code", default="de", help="Target code (default: de)")
+    parser.add_argument(
+        "--corpora",
+        default=",".join(CORPORA),
+        help="Comma-separated corpora to run (default: short,medium,long)",
+    )
+    parser.add_argument(
+        "--stub", action="store_true", help="Use a stub translator instead of installed models"
+    )
+    parser.add_argument(
+        "--stub-delay-ms",
+        type=float,
+        default=0.0,
+        help="Simulated model time per sentence in stub mode (default: 0)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep the result cache and translation memory enabled (default: off)",
+    )
+    parser.add_argument(
+        "--batched", action="store_true", help="Use sentence-batched inference (ARGOS_BATCHED)"
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON results to this file")
+    parser.add_argument("--compare", type=Path, help="Previous results file to compare against")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str]) -> int:
+    """Run the benchmark; returns the process exit code."""
+    args = parse_args(argv)
+    names = [name.strip() for name in args.corpora.split(",") if name.strip()]
+    unknown = [name for name in names if name not in CORPORA]
+    if unknown:
+        print(f"error: unknown corpus: {', '.join(unknown)}", file=sys.stderr)
+        return 2
+
+    from config import Config
+
+    Config.BATCHED_TRANSLATION = args.batched
+    if args.stub:
+        # Stub translations only exist in this process
+        Config.WORKERS = 0
+
+    import engine
+
+    if not args.cache:
+        engine.result_cache = None
+        engine.translation_memory = None
+    if args.stub:
+        install_stub_translator(args.stub_delay_ms / 1000)
+
+    codes = {code: name for name, code in engine.translator_registry.language_map().items()}
+    if args.from_code not in codes or args.to_code not in codes:
+        print(f"error: {args.from_code} -> {args.to_code} is not installed", file=sys.stderr)
+        return 2
+    from_name, to_name = codes[args.from_code], codes[args.to_code]
+
+    # Warm up: load the models and run each corpus' first document once
+    for name in names:
+        run_corpus(build_corpus(name)[:1], from_name, to_name)
+
+    results = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "mode": "stub" if args.stub else "models",
+        "pair": f"{args.from_code}->{args.to_code}",
+        "versions": _versions(),
+        "settings": {
+            "batched": Config.BATCHED_TRANSLATION,
+            "max_batch_tokens": Config.MAX_BATCH_TOKENS,
+            "workers": Config.WORKERS,
+            "threads_per_worker": Config.THREADS_PER_WORKER,
+            "cache": args.cache,
+            "stub_delay_ms": args.stub_delay_ms if args.stub else None,
+        },
+        "corpora": {},
+    }
+    for name in names:
+        result = run_corpus(build_corpus(name), from_name, to_name)
+        results["corpora"][name] = asdict(result)
+        print(
+            f"[bench] {name:<6} {result.documents:>4} docs  p50 {result.p50_ms:9.2f} ms  "
+            f"p95 {result.p95_ms:9.2f} ms  {result.sentences_per_second:10.1f} sentences/s",
+            file=sys.stderr,
+        )
+    # Joined workers become reaped children, so their model memory is included
+    pool = engine.get_worker_pool()
+    if pool is not None:
+        pool.shutdown()
+    results["peak_rss_mb"] = peak_rss_mb()
+    print(f"[bench] peak RSS {results['peak_rss_mb']} MiB", file=sys.stderr)
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        for line in compare(results, baseline):
+            print(f"[compare] {line}", file=sys.stderr)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+    return 0
@@ -0,0 +1,304 @@
+"""Command line entry point for ``cindergrace-argos``.
+
+``cindergrace-argos`` without arguments starts the web server as before.
+``cindergrace-argos translate --from en --to de [FILE]`` translates plain
+lines or JSONL from a file or stdin to stdout without importing Gradio.
+``cindergrace-argos bench`` runs the benchmark suite (see ``benchmark.py``) and
+``cindergrace-argos loadtest`` a local load test (see ``loadtest.py``).
+``cindergrace-argos autotune`` saves the fastest inference settings for this
+machine (see ``autotune.py``), ``cindergrace-argos tm`` imports, exports
+and summarizes the translation memory and ``cindergrace-argos store`` fills
+and indexes the package store.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+from xml.etree import ElementTree
+
+
+def parse_translate_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="cindergrace-argos translate",
+        description="Translate lines or JSONL records from a file or stdin to stdout.",
+    )
+    parser.add_argument("input", nargs="?", default="-", help="Input file (default: stdin)")
+    parser.add_argument("--from", dest="from_code", required=True, help="Source language code")
+    parser.add_argument("--to", dest="to_code", required=True, help="Target language code")
+    parser.add_argument(
+        "--format",
+        choices=["lines", "jsonl"],
+        help="Input format (default: jsonl for *.jsonl files, otherwise lines)",
+    )
+    parser.add_argument(
+        "--field",
+        default="text",
+        help="JSONL field to translate, dotted paths allowed (default: text)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Translate in this many worker processes (default: ARGOS_WORKERS)",
+    )
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        help="CTranslate2 threads per worker process (default: ARGOS_THREADS_PER_WORKER)",
+    )
+    parser.add_argument(
+        "--max-batch-tokens",
+        type=int,
+        help="Token budget per model batch (default: ARGOS_MAX_BATCH_TOKENS)",
+    )
+    parser.add_argument(
+        "--no-batch",
+        action="store_true",
+        help="Translate each record on its own instead of sentence batches",
+    )
+    return parser.parse_args(argv)
+
+
+def run_translate(argv: list[str]) -> int:
+    """Run the batch translation command; returns the process exit code."""
+    args = parse_translate_args(argv)
+
+    from config import Config
+
+    # CLI flags override the environment for this run only
+    Config.BATCHED_TRANSLATION = not args.no_batch
+    if args.workers is not None:
+        Config.WORKERS = args.workers
+    if args.threads_per_worker is not None:
+        Config.THREADS_PER_WORKER = args.threads_per_worker
+    if args.max_batch_tokens is not None:
+        Config.MAX_BATCH_TOKENS = args.max_batch_tokens
+
+    from documents import DocumentReport, LineReader, read_records, translate_records
+    from engine import NoPackageError, translator_registry
+    from worker_pool import get_worker_pool
+
+    installed = set(translator_registry.language_map().values())
+    for code in (args.from_code, args.to_code):
+        if code not in installed:
+            print(f"error: language '{code}' is not installed", file=sys.stderr)
+            return 2
+
+    fmt = args.format or ("jsonl" if args.input.endswith(".jsonl") else "lines")
+    report = DocumentReport()
+    start = time.perf_counter()
+    pool = get_worker_pool()
+    stdin = args.input == "-"
+    stream = sys.stdin.buffer if stdin else Path(args.input).open("rb")
+    try:
+        records = read_records(fmt, LineReader(stream, report), args.field)
+        translate_records(records, sys.stdout, args.from_code, args.to_code, report)
+    except NoPackageError:
+        print(
+            f"error: no installed language package for {args.from_code} -> {args.to_code}",
+            file=sys.stderr,
+        )
+        return 2
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # Output was closed early (e.g. piped into head). Point stdout at devnull so the
+        # flush at interpreter exit does not fail again; stderr stays usable.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        if not stdin:
+            stream.close()
+        if pool is not None:
+            pool.shutdown()
+
+    wall = time.perf_counter() - start
+    rate = report.records / wall if wall > 0 else 0.0
+    print(
+        f"[summary] {report.records} lines, {report.characters} characters, "
+        f"{wall:.2f}s wall time, {rate:.1f} lines/s",
+        file=sys.stderr,
+    )
+    return 0
+
+
+def parse_tm_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="cindergrace-argos tm",
+        description="Import, export or summarize the translation memory.",
+    )
+    parser.add_argument("action", choices=["import", "export", "stats"])
+    parser.add_argument("file", nargs="?", default="-", help="TMX or JSONL file (default: stdio)")
+    parser.add_argument("--from", dest="from_code", help="Source language code")
+    parser.add_argument("--to", dest="to_code", help="Target language code")
+    parser.add_argument(
+        "--format",
+        choices=["jsonl", "tmx"],
+        help="File format (default: tmx for *.tmx files, otherwise jsonl)",
+    )
+    return parser.parse_args(argv)
+
+
+def run_tm(argv: list[str]) -> int:
+    """Run a translation memory command; returns the process exit code."""
+    args = parse_tm_args(argv)
+    if bool(args.from_code) != bool(args.to_code):
+        print("error: --from and --to must be given together", file=sys.stderr)
+        return 2
+
+    import translation_memory as tm
+
+    # Works while ARGOS_TM is off, so a memory can be seeded before it is enabled
+    memory = tm.translation_memory or tm.TranslationMemory.from_config(force=True)
+    if args.action == "stats":
+        print(json.dumps({"path": str(memory.path), **memory.stats()}, indent=2))
+        return 0
+
+    fmt = args.format or ("tmx" if args.file.endswith(".tmx") else "jsonl")
+    stdio = args.file == "-"
+    if args.action == "export":
+        rows = memory.entries(args.from_code, args.to_code)
+        if fmt == "tmx":
+            stream = sys.stdout.buffer if stdio else Path(args.file).open("wb")
+            writer = tm.write_tmx
+        else:
+            stream = sys.stdout if stdio else Path(args.file).open("w", encoding="utf-8")
+            writer = tm.write_jsonl
+        try:
+            count = writer(rows, stream)
+        finally:
+            if not stdio:
+                stream.close()
+        print(f"[memory] exported {count} segments", file=sys.stderr)
+        return 0
+
+    if fmt == "tmx":
+        stream = sys.stdin.buffer if stdio else Path(args.file).open("rb")
+        rows = tm.read_tmx(stream, args.from_code, args.to_code)
+    else:
+        stream = sys.stdin if stdio else Path(args.file).open(encoding="utf-8")
+        rows = tm.read_jsonl(stream, args.from_code, args.to_code)
+    count = 0
+    try:
+        # Grouped into chunks per pair so each commit covers many rows
+        pending: dict[tuple[str, str], list[tuple[str, str]]] = {}
+        for from_code, to_code, source, target in rows:
+            chunk = pending.setdefault((from_code, to_code), [])
+            chunk.append((source, target))
+            if len(chunk) >= 1000:
+                count += memory.add(from_code, to_code, chunk, origin="import")
+                chunk.clear()
+        for (from_code, to_code), chunk in pending.items():
+            count += memory.add(from_code, to_code, chunk, origin="import")
+    except (ValueError, ElementTree.ParseError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if not stdio:
+            stream.close()
+    print(f"[memory] imported {count} segments", file=sys.stderr)
+    return 0
+
+
+def parse_store_args(argv: list[str]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="cindergrace-argos store",
+        description="Fill, index or list the package store (see package_store.py).",
+    )
+    parser.add_argument(
+        "action",
+        choices=["add", "fetch", "index", "list"],
+        help="add archives, fetch packages from the index, rebuild index.json, or list",
+    )
+    parser.add_argument(
+        "items",
+        nargs="*",
+        help="add: .argosmodel files; fetch: pairs like en:de (default: all packages)",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="index: write absolute links below this URL instead of relative ones",
+    )
+    return parser.parse_args(argv)
+
+
+def run_store(argv: list[str]) -> int:
+    """Run a package store command; returns the process exit code."""
+    args = parse_store_args(argv)
+
+    from package_downloads import DownloadError, download_package
+    from package_store import package_key, package_store
+
+    if args.action == "list":
+        for from_code, to_code, version in sorted(package_store.index()):
+            print(f"{from_code} -> {to_code}  {version}")
+        return 0
+    if args.action == "index":
+        count = package_store.write_index(args.base_url)
+        print(f"[store] indexed {count} packages in {package_store.root}", file=sys.stderr)
+        return 0
+
+    failed = 0
+    if args.action == "add":
+        for item in args.items:
+            try:
+                path = package_store.add(Path(item))
+            except (OSError, ValueError, DownloadError) as e:
+                print(f"error: {item}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            print(f"[store] {item} -> {path}", file=sys.stderr)
+        return 1 if failed else 0
+
+    from package_index import package_index
+
+    package_index.refresh()
+    pairs = {tuple(item.split(":", 1)) for item in args.items}
+    for pkg in package_index.available_packages():
+        from_code, to_code, version = package_key(pkg)
+        if pairs and (from_code, to_code) not in pairs:
+            continue
+        try:
+            path = download_package(pkg)
+        except (OSError, DownloadError) as e:
+            print(f"error: {from_code} -> {to_code}: {e}", file=sys.stderr)
+            failed += 1
+            continue
+        print(f"[store] {from_code} -> {to_code} {version}: {path.name}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def main() -> None:
+    """Dispatch to the batch translator or start the web server."""
+    argv = sys.argv[1:]
+    if argv and argv[0] == "translate":
+        sys.exit(run_translate(argv[1:]))
+    if argv and argv[0] == "bench":
+        from benchmark import main as bench_main
+
+        sys.exit(bench_main(argv[1:]))
+    if argv and argv[0] == "loadtest":
+        from loadtest import main as loadtest_main
+
+        sys.exit(loadtest_main(argv[1:]))
+    if argv and argv[0] == "tm":
+        sys.exit(run_tm(argv[1:]))
+    if argv and argv[0] == "store":
+        sys.exit(run_store(argv[1:]))
+    if argv and argv[0] == "autotune":
+        from autotune import main as autotune_main
+
+        sys.exit(autotune_main(argv[1:]))
+
+    # Imported lazily so batch runs never pay for Gradio
+    from app import main as app_main
+
+    app_main()
+
+
+if __name__ == "__main__":
+    main()
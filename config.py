@@ -0,0 +1,122 @@
+"""Configuration and persisted state shared by the UI and headless entry points.
+
+Kept free of Gradio imports so the backend can be used without the web UI.
+"""
+import os
+from pathlib import Path
+
+from cindergrace_common import BaseConfig, SecurityMixin, XDGStateStore, env_bool, env_int
+
+APP_NAME = "cindergrace_argos"
+
+# --- State Management ---
+DEFAULT_STATE = {
+    "disclaimer_accepted": False,
+    "port": 7866,
+    "language": "en",
+}
+
+state_store = XDGStateStore(
+    app_name=APP_NAME,
+    defaults=DEFAULT_STATE,
+)
+
+
+def _env_optional_int(name: str) -> int | None:
+    """Integer from the environment, or None when unset so other sources can apply."""
+    value = os.environ.get(name, "").strip()
+    return int(value) if value else None
+
+
+def get_state_dir() -> Path:
+    """Return the XDG state directory used for the state file and caches."""
+    base = os.environ.get("XDG_STATE_HOME") or Path.home() / ".local" / "state"
+    return Path(base) / APP_NAME
+
+
+class Config(BaseConfig, SecurityMixin):
+    """Application configuration."""
+    APP_PREFIX = "ARGOS"
+
+    # Server settings
+    PORT = env_int("ARGOS_PORT", 7866)
+    # ARGOS_ALLOW_REMOTE=1 for network access (from SecurityMixin)
+
+    # Package management can be disabled for read-only mode
+    ENABLE_PACKAGE_MANAGEMENT = env_bool("ARGOS_ENABLE_PACKAGES", True)
+
+    # Translation result cache (in-memory LRU + SQLite on disk)
+    CACHE_ENABLED = env_bool("ARGOS_CACHE", True)
+    CACHE_MEMORY_ENTRIES = env_int("ARGOS_CACHE_MEMORY_ENTRIES", 2048)
+    CACHE_DISK_MB = env_int("ARGOS_CACHE_DISK_MB", 256)  # 0 disables the disk tier
+
+    # Translation memory: reuse stored sentence translations at or above this similarity (%)
+    TM_ENABLED = env_bool("ARGOS_TM", False)
+    TM_THRESHOLD = env_int("ARGOS_TM_THRESHOLD", 95)  # 100 = exact matches only
+
+    # Sentence-segmented, batched inference (keeps paragraph and whitespace layout)
+    BATCHED_TRANSLATION = env_bool("ARGOS_BATCHED", False)
+    MAX_BATCH_TOKENS = env_int("ARGOS_MAX_BATCH_TOKENS", 1024)
+    # Micro-batching: wait this long for concurrent requests of the same pair (0 = off)
+    MICROBATCH_WAIT_MS = env_int("ARGOS_MICROBATCH_WAIT_MS", 0)
+    MICROBATCH_MAX_REQUESTS = env_int("ARGOS_MICROBATCH_MAX_REQUESTS", 32)
+
+    # Stream translated paragraphs to the UI as soon as each one is finished
+    STREAM_TRANSLATION = env_bool("ARGOS_STREAM", True)
+    # Translate as you type: live mode default and pause after the last keystroke
+    LIVE_TRANSLATION = env_bool("ARGOS_LIVE", False)
+    LIVE_DEBOUNCE_MS = env_int("ARGOS_LIVE_DEBOUNCE_MS", 400)
+
+    # Translation worker processes (0 = translate in the request thread)
+    WORKERS = env_int("ARGOS_WORKERS", 0)
+    THREADS_PER_WORKER = env_int("ARGOS_THREADS_PER_WORKER", 1)
+    # Targets of a multi-target translation run at once (0 = one per worker process,
+    # or 2 when translating in-process)
+    FANOUT_WORKERS = env_int("ARGOS_FANOUT_WORKERS", 0)
+
+    # Headless JSON API (LibreTranslate-compatible) next to or instead of the UI
+    API_ENABLED = env_bool("ARGOS_API", False)
+    API_PORT = env_int("ARGOS_API_PORT", 5000)
+    API_MAX_BATCH = env_int("ARGOS_API_MAX_BATCH", 128)
+    UI_ENABLED = env_bool("ARGOS_UI", True)
+    # Gradio events handled at once per event listener (Gradio's default is 1)
+    UI_CONCURRENCY = env_int("ARGOS_UI_CONCURRENCY", 1)
+
+    # Package index: reuse the local copy for this long, never go online when offline
+    PACKAGE_INDEX_TTL_HOURS = env_int("ARGOS_INDEX_TTL_HOURS", 24)
+    OFFLINE = env_bool("ARGOS_OFFLINE", False)
+
+    # Package downloads: parallel downloads per update (installs stay sequential)
+    DOWNLOAD_WORKERS = env_int("ARGOS_DOWNLOAD_WORKERS", 4)
+    # Package store: downloaded archives by sha256 (may be a shared directory, see
+    # package_store.py); the mirror is a read-only store served over HTTP or from a directory
+    PACKAGE_STORE = os.environ.get("ARGOS_PACKAGE_STORE", "").strip()
+    PACKAGE_MIRROR = os.environ.get("ARGOS_PACKAGE_MIRROR", "").strip() or None
+
+    # Routing: pairs without a direct package are translated through pivot languages
+    MAX_ROUTE_HOPS = env_int("ARGOS_MAX_ROUTE_HOPS", 2)  # 1 disables pivoting
+
+    # Inference tuning (unset = autotuned or built-in value, see tuning.py)
+    INTER_THREADS = _env_optional_int("ARGOS_INTER_THREADS")
+    INTRA_THREADS = _env_optional_int("ARGOS_INTRA_THREADS")
+    COMPUTE_TYPE = os.environ.get("ARGOS_COMPUTE_TYPE", "").strip() or None
+    BEAM_SIZE = _env_optional_int("ARGOS_BEAM_SIZE")
+    MAX_DECODING_LENGTH = _env_optional_int("ARGOS_MAX_DECODING_LENGTH")
+    # Per-pair overrides as JSON: {"en:de": {"beam_size": 2}}
+    PAIR_TUNING = os.environ.get("ARGOS_PAIR_TUNING", "").strip()
+
+    # Model residency: memory budget for loaded models and idle unload time (0 = unlimited)
+    MODEL_MEMORY_MB = env_int("ARGOS_MODEL_MEMORY_MB", 0)
+    MODEL_IDLE_SECONDS = env_int("ARGOS_MODEL_IDLE_SECONDS", 0)
+
+    # Metrics: Prometheus endpoint at /metrics with per-pair counters and histograms
+    METRICS_ENABLED = env_bool("ARGOS_METRICS", False)
+    # Tracing: per-request stage timings as JSON log lines and a debug panel in the UI
+    TRACE_ENABLED = env_bool("ARGOS_TRACE", False)
+    # Profiling: cProfile every request, keep profiles of requests at least this slow (0 = off)
+    PROFILE_SLOW_MS = env_int("ARGOS_PROFILE_SLOW_MS", 0)
+
+    # Startup: pairs to load and warm up in the background ("en:de,de:en" or "all")
+    PRELOAD = os.environ.get("ARGOS_PRELOAD", "").strip()
+    # Startup: print a per-phase timing report to stderr
+    STARTUP_TIMING = env_bool("ARGOS_STARTUP_TIMING", False)
@@ -0,0 +1,351 @@
+"""Streaming translation of whole files (.txt, .md, .srt, .jsonl, .csv).
+
+Files are read record by record, translated in small groups and written out
+immediately, so memory use does not grow with the file size. A record is
+whatever unit the format has (a paragraph, a subtitle cue, a JSON line, a CSV
+row); its translatable texts are collected, translated together with the
+rest of the group through ``engine.translate_many`` and rendered back into
+the original structure.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+import re
+import sys
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+from engine import translate_many
+
+SUPPORTED_SUFFIXES = (".txt", ".md", ".srt", ".jsonl", ".csv")
+
+# A group is translated once it holds this many texts or characters
+GROUP_MAX_TEXTS = 64
+GROUP_MAX_CHARS = 16_000
+# Very long paragraphs without blank lines are flushed in pieces of this many lines
+PARAGRAPH_MAX_LINES = 200
+
+_MD_FENCE = re.compile(r"^\s*(```|~~~)")
+_MD_PREFIX = re.compile(r"^(\s*(?:#{1,6}\s+|[-*+]\s+|\d+[.)]\s+|>\s*)+)")
+_SRT_TIMING = re.compile(r"^\d{1,2}:\d{2}:\d{2}[,.]\d{1,3}\s+-->\s+")
+
+
+@dataclass
+class Record:
+    """One unit of a document: texts to translate and how to write them back."""
+
+    texts: list[str]
+    render: Callable[[list[str]], str]
+
+
+@dataclass
+class DocumentReport:
+    """Counters of a finished (or running) file translation."""
+
+    records: int = 0
+    texts: int = 0
+    characters: int = 0
+    bytes_read: int = 0
+    total_bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def chars_per_second(self) -> float:
+        return self.characters / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.seconds if self.seconds > 0 else 0.0
+
+
+class LineReader:
+    """Decode a binary stream line by line while counting the bytes consumed."""
+
+    def __init__(self, stream: BinaryIO, report: DocumentReport):
+        self.stream = stream
+        self.report = report
+
+    def __iter__(self) -> Iterator[str]:
+        first = True
+        for raw in self.stream:
+            self.report.bytes_read += len(raw)
+            line = raw.decode("utf-8-sig" if first else "utf-8", errors="replace")
+            first = False
+            yield line
+
+
+def _split_outer_whitespace(text: str) -> tuple[str, str, str]:
+    core = text.strip()
+    if not core:
+        return text, "", ""
+    lead = text[: len(text) - len(text.lstrip())]
+    trail = text[len(text.rstrip()):]
+    return lead, core, trail
+
+
+def _text_record(text: str) -> Record:
+    """Record for a paragraph whose outer whitespace is kept verbatim."""
+    lead, core, trail = _split_outer_whitespace(text)
+    if not core:
+        return Record([], lambda _t: text)
+    return Record([core], lambda t: f"{lead}{t[0]}{trail}")
+
+
+def _verbatim(text: str) -> Record:
+    return Record([], lambda _t: text)
+
+
+def _iter_paragraphs(lines: Iterable[str]) -> Iterator[str]:
+    """Group lines into paragraphs; blank lines are attached to the preceding one."""
+    block: list[str] = []
+    content_lines = 0
+    for line in lines:
+        if not line.strip():
+            block.append(line)
+            continue
+        if content_lines and (block[-1].strip() == "" or content_lines >= PARAGRAPH_MAX_LINES):
+            yield "".join(block)
+            block, content_lines = [], 0
+        block.append(line)
+        content_lines += 1
+    if block:
+        yield "".join(block)
+
+
+def read_lines(lines: Iterable[str]) -> Iterator[Record]:
+    """One record per line, for line-oriented input such as logs or string lists."""
+    for line in lines:
+        yield _text_record(line)
+
+
+def read_text(lines: Iterable[str]) -> Iterator[Record]:
+    for paragraph in _iter_paragraphs(lines):
+        yield _text_record(paragraph)
+
+
+def _markdown_line_record(line: str) -> Record:
+    """Keep heading, list and quote markers out of the model input."""
+    match = _MD_PREFIX.match(line)
+    prefix = match.group(1) if match else ""
+    body = line[len(prefix):]
+    lead, core, trail = _split_outer_whitespace(body)
+    if not core:
+        return _verbatim(line)
+    return Record([core], lambda t: f"{prefix}{lead}{t[0]}{trail}")
+
+
+def read_markdown(lines: Iterable[str]) -> Iterator[Record]:
+    in_fence = False
+    pending: list[str] = []
+
+    def flush() -> Iterator[Record]:
+        if pending:
+            yield from read_text(list(pending))
+            pending.clear()
+
+    for line in lines:
+        if _MD_FENCE.match(line):
+            yield from flush()
+            in_fence = not in_fence
+            yield _verbatim(line)
+        elif in_fence:
+            yield _verbatim(line)
+        elif _MD_PREFIX.match(line):
+            yield from flush()
+            yield _markdown_line_record(line)
+        else:
+            pending.append(line)
+            if len(pending) >= PARAGRAPH_MAX_LINES:
+                yield from flush()
+    yield from flush()
+
+
+def _srt_record(block: list[str]) -> Record:
+    # Index and timing lines are copied, everything after them is subtitle text
+    header_end = 0
+    for i, line in enumerate(block[:2]):
+        if line.strip().isdigit() or _SRT_TIMING.match(line):
+            header_end = i + 1
+    header = "".join(block[:header_end])
+    body = "".join(block[header_end:])
+    lead, core, trail = _split_outer_whitespace(body)
+    if not core:
+        return _verbatim(header + body)
+    return Record([core], lambda t: f"{header}{lead}{t[0]}{trail}")
+
+
+def read_srt(lines: Iterable[str]) -> Iterator[Record]:
+    block: list[str] = []
+    for line in lines:
+        block.append(line)
+        if not line.strip():
+            yield _srt_record(block)
+            block = []
+    if block:
+        yield _srt_record(block)
+
+
+def _get_field(obj, path: list[str]):
+    for key in path:
+        if isinstance(obj, dict):
+            obj = obj.get(key)
+        elif isinstance(obj, list) and key.isdigit() and int(key) < len(obj):
+            obj = obj[int(key)]
+        else:
+            return None
+    return obj
+
+
+def _set_field(obj, path: list[str], value) -> None:
+    for key in path[:-1]:
+        obj = obj[int(key)] if isinstance(obj, list) else obj[key]
+    if isinstance(obj, list):
+        obj[int(path[-1])] = value
+    else:
+        obj[path[-1]] = value
+
+
+def read_jsonl(lines: Iterable[str], field: str = "text") -> Iterator[Record]:
+    """One record per JSON line; ``field`` is a dotted path to the text (e.g. ``data.text``)."""
+    path = field.split(".")
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            yield _verbatim(line)
+            continue
+        try:
+            obj = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e.msg})") from e
+        value = _get_field(obj, path)
+        if not isinstance(value, str) or not value.strip():
+            yield _verbatim(line if line.endswith("\n") else line + "\n")
+            continue
+
+        def render(t: list[str], obj=obj) -> str:
+            _set_field(obj, path, t[0])
+            return json.dumps(obj, ensure_ascii=False) + "\n"
+
+        yield Record([value], render)
+
+
+def read_csv(lines: Iterable[str], column: str = "text") -> Iterator[Record]:
+    """One record per row; ``column`` is a header name or a 0-based column index."""
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return
+
+    def write_row(row: list[str]) -> str:
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(row)
+        return buffer.getvalue()
+
+    if column in header:
+        index = header.index(column)
+    elif column.isdigit():
+        index = int(column)
+    else:
+        raise ValueError(f"Column '{column}' not found in CSV header: {', '.join(header)}")
+    yield _verbatim(write_row(header))
+
+    for row in reader:
+        if index >= len(row) or not row[index].strip():
+            yield _verbatim(write_row(row))
+            continue
+
+        def render(t: list[str], row=row) -> str:
+            row[index] = t[0]
+            return write_row(row)
+
+        yield Record([row[index]], render)
+
+
+def read_records(fmt: str, lines: Iterable[str], field: str = "text") -> Iterator[Record]:
+    """Dispatch to the reader for a format name (suffix without the dot)."""
+    if fmt == "md":
+        return read_markdown(lines)
+    if fmt == "srt":
+        return read_srt(lines)
+    if fmt == "jsonl":
+        return read_jsonl(lines, field)
+    if fmt == "csv":
+        return read_csv(lines, field)
+    if fmt == "lines":
+        return read_lines(lines)
+    return read_text(lines)
+
+
+def translate_records(
+    records: Iterable[Record],
+    out: TextIO,
+    from_code: str,
+    to_code: str,
+    report: DocumentReport,
+    on_progress: Callable[[DocumentReport], None] | None = None,
+    translate: Callable[[list[str], str, str], list[str]] = translate_many,
+) -> DocumentReport:
+    """Translate records in bounded groups and write each group as soon as it is done."""
+    start = time.perf_counter()
+    group: list[Record] = []
+    group_texts = 0
+    group_chars = 0
+
+    def flush() -> None:
+        nonlocal group, group_texts, group_chars
+        texts = [text for record in group for text in record.texts]
+        translated = translate(texts, from_code, to_code) if texts else []
+        offset = 0
+        for record in group:
+            count = len(record.texts)
+            out.write(record.render(translated[offset:offset + count]))
+            offset += count
+        report.records += len(group)
+        report.texts += len(texts)
+        report.characters += group_chars
+        report.seconds = time.perf_counter() - start
+        group, group_texts, group_chars = [], 0, 0
+        if on_progress is not None:
+            on_progress(report)
+
+    for record in records:
+        group.append(record)
+        group_texts += len(record.texts)
+        group_chars += sum(len(text) for text in record.texts)
+        if group_texts >= GROUP_MAX_TEXTS or group_chars >= GROUP_MAX_CHARS:
+            flush()
+    if group:
+        flush()
+    out.flush()
+    report.seconds = time.perf_counter() - start
+    return report
+
+
+def translate_file(
+    src: Path,
+    dst: Path,
+    from_code: str,
+    to_code: str,
+    field: str = "text",
+    on_progress: Callable[[DocumentReport], None] | None = None,
+) -> DocumentReport:
+    """Translate ``src`` into ``dst``; the format follows the source file suffix."""
+    fmt = src.suffix.lower().lstrip(".")
+    if f".{fmt}" not in SUPPORTED_SUFFIXES:
+        raise ValueError(f"Unsupported file type: {src.suffix}")
+    report = DocumentReport(total_bytes=src.stat().st_size)
+    # newline="": line endings of the source are written back unchanged
+    with src.open("rb") as fh, dst.open("w", encoding="utf-8", newline="") as out:
+        records = read_records(fmt, LineReader(fh, report), field)
+        translate_records(records, out, from_code, to_code, report, on_progress)
+    print(
+        f"[documents] {src.name} {from_code}->{to_code}: {report.records} records, "
+        f"{report.characters} chars in {report.seconds:.1f}s "
+        f"({report.chars_per_second:.0f} chars/s)",
+        file=sys.stderr,
+    )
+    return report
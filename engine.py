@@ -0,0 +1,911 @@
+"""Translation backend shared by the web UI and other entry points.
+
+Keeps resolved Argos translation objects resident for the lifetime of the
+process so the hot path does not rescan installed packages on every call.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+
+from config import Config
+from metrics import translation_metrics
+from microbatch import MicroBatcher
+from result_cache import result_cache
+from routing import Route, RouteTable
+from segmentation import join_segments, make_batches, segment_text, split_paragraphs
+from tracing import stage
+from translation_memory import translation_memory
+from tuning import inference_tuning
+from worker_pool import get_worker_pool
+
+
+class NoPackageError(LookupError):
+    """Raised when no installed package can translate a language pair."""
+
+    def __init__(self, from_lang: str, to_lang: str):
+        super().__init__(f"No installed language package found for {from_lang} -> {to_lang}")
+        self.from_lang = from_lang
+        self.to_lang = to_lang
+
+
+@dataclass
+class BatchReport:
+    """Throughput of one segmented translation."""
+
+    sentences: int = 0
+    cached: int = 0
+    memory: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+
+    @property
+    def sentences_per_second(self) -> float:
+        return self.sentences / self.seconds if self.seconds > 0 else 0.0
+
+
+@dataclass
+class StreamTiming:
+    """Latency of one streamed translation."""
+
+    pair: str
+    paragraphs: int
+    first_output_seconds: float
+    total_seconds: float
+
+
+@dataclass
+class RouteReport:
+    """Route taken by a translation and the time spent on each of its hops."""
+
+    route: Route | None = None
+    hop_seconds: list[float] = field(default_factory=list)
+
+    def record(self, route: Route, seconds: list[float]) -> None:
+        # Streamed translations add up the hop times of all paragraphs
+        if self.route != route:
+            self.route = route
+            self.hop_seconds = [0.0] * len(route.hops)
+        self.hop_seconds = [total + s for total, s in zip(self.hop_seconds, seconds, strict=True)]
+
+    def describe(self) -> str:
+        """Return e.g. ``fr -> en (0.31s) -> de (0.28s)``."""
+        if self.route is None:
+            return ""
+        parts = [self.route.codes[0]]
+        for (_from_code, to_code), seconds in zip(self.route.hops, self.hop_seconds, strict=True):
+            parts.append(f"{to_code} ({seconds:.2f}s)")
+        return " -> ".join(parts)
+
+
+@dataclass
+class FanoutResult:
+    """Translations of a multi-target request into one of its targets."""
+
+    to_code: str
+    texts: list[str] | None = None
+    error: Exception | None = None
+    seconds: float = 0.0
+    report: RouteReport = field(default_factory=RouteReport)
+    batch: BatchReport = field(default_factory=BatchReport)
+
+
+# Most recent streamed translations, newest last
+stream_timings: deque[StreamTiming] = deque(maxlen=200)
+
+
+@dataclass
+class PairStats:
+    """Load and usage counters for one resident language pair."""
+
+    load_seconds: float = 0.0
+    loads: int = 0
+    hits: int = 0
+    evictions: int = 0
+    # Memory attributed to the resident model (RSS growth while it loaded)
+    resident_bytes: int = 0
+    last_used: float = 0.0
+
+
+def _process_rss() -> int | None:
+    """Current resident set size of this process in bytes (Linux only)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _model_disk_size(translation) -> int:
+    """Size of a package's model files, used when RSS growth cannot be measured."""
+    translation = getattr(translation, "underlying", translation)
+    pkg = getattr(translation, "pkg", None)
+    package_path = getattr(pkg, "package_path", None)
+    if package_path is None:
+        return 0
+    model_dir = package_path / "model"
+    try:
+        return sum(path.stat().st_size for path in model_dir.rglob("*") if path.is_file())
+    except OSError:
+        return 0
+
+
+class TranslatorRegistry:
+    """Process-wide cache of installed languages and translation objects.
+
+    The registry is only invalidated when packages are installed or removed,
+    so steady-state translations are a dictionary lookup. Resident models are
+    kept within ARGOS_MODEL_MEMORY_MB by evicting the least recently used
+    pair, and pairs idle for ARGOS_MODEL_IDLE_SECONDS are unloaded.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pair_locks: dict[tuple[str, str], threading.Lock] = {}
+        self._language_map: dict[str, str] | None = None
+        self._package_versions: dict[tuple[str, str], str] = {}
+        self._installed_packages: list = []
+        self._routes: RouteTable | None = None
+        self._translations: dict[tuple[str, str], object] = {}
+        self._stats: dict[tuple[str, str], PairStats] = {}
+        self._generation = 0
+        # Loads are serialized so RSS growth can be attributed to one model
+        self._load_lock = threading.Lock()
+        self._reaper: threading.Thread | None = None
+
+    @property
+    def generation(self) -> int:
+        """Counter bumped on every invalidation."""
+        return self._generation
+
+    def _ensure_scanned(self) -> None:
+        # Caller holds self._lock
+        if self._language_map is None:
+            import argostranslate.package
+
+            unique_languages = set()  # To store (name, code) tuples
+            versions = {}
+            installed = argostranslate.package.get_installed_packages()
+            for pkg in installed:
+                unique_languages.add((pkg.from_name, pkg.from_code))
+                unique_languages.add((pkg.to_name, pkg.to_code))
+                versions[(pkg.from_code, pkg.to_code)] = str(
+                    getattr(pkg, "package_version", "") or ""
+                )
+            self._language_map = dict(unique_languages)
+            self._package_versions = versions
+            self._installed_packages = list(installed)
+            self._routes = RouteTable(versions, max_hops=Config.MAX_ROUTE_HOPS)
+
+    def language_map(self) -> dict[str, str]:
+        """Return a mapping of installed language names to codes."""
+        with self._lock:
+            self._ensure_scanned()
+            return dict(self._language_map)
+
+    def package_version(self, from_code: str, to_code: str) -> str:
+        """Return the installed package version for a pair ("" if unknown)."""
+        with self._lock:
+            self._ensure_scanned()
+            return self._package_versions.get((from_code, to_code), "")
+
+    def installed_packages(self) -> list:
+        """Return the installed package objects (scanned once per package change)."""
+        with self._lock:
+            self._ensure_scanned()
+            return list(self._installed_packages)
+
+    def installed_pairs(self) -> list[tuple[str, str]]:
+        """Return the (from_code, to_code) pairs of all installed packages."""
+        with self._lock:
+            self._ensure_scanned()
+            return sorted(self._package_versions)
+
+    def route(self, from_code: str, to_code: str) -> Route:
+        """Return the cheapest installed route for a pair (precomputed per package set)."""
+        if from_code == to_code:
+            return Route(((from_code, to_code),))
+        with self._lock:
+            self._ensure_scanned()
+            route = self._routes.route(from_code, to_code)
+        if route is None:
+            raise NoPackageError(from_code, to_code)
+        return route
+
+    def route_targets(self, from_code: str) -> list[str]:
+        """Return the codes reachable from ``from_code`` directly or through pivots."""
+        with self._lock:
+            self._ensure_scanned()
+            return self._routes.targets(from_code)
+
+    def language_names(self) -> list[str]:
+        """Return the sorted names of all installed languages."""
+        return sorted(self.language_map().keys())
+
+    def resolve_codes(self, from_name: str, to_name: str) -> tuple[str, str]:
+        """Translate a pair of language names into language codes."""
+        lang_map = self.language_map()
+        try:
+            return lang_map[from_name], lang_map[to_name]
+        except KeyError as e:
+            raise NoPackageError(from_name, to_name) from e
+
+    def get(self, from_code: str, to_code: str):
+        """Return the resident translation object for a pair, loading it once."""
+        key = (from_code, to_code)
+        translation = self._translations.get(key)
+        if translation is not None:
+            self._touch(key)
+            return translation
+
+        with self._lock:
+            pair_lock = self._pair_locks.setdefault(key, threading.Lock())
+
+        with pair_lock:
+            # Another thread may have loaded the pair while we waited.
+            translation = self._translations.get(key)
+            if translation is not None:
+                self._touch(key)
+                return translation
+
+            # Imported on first use: it pulls in the model runtime
+            import argostranslate.translate
+
+            generation = self._generation
+            with self._load_lock:
+                rss_before = _process_rss()
+                start = time.perf_counter()
+                translation = argostranslate.translate.get_translation_from_codes(
+                    from_code, to_code
+                )
+                if not translation:
+                    raise NoPackageError(from_code, to_code)
+                # Load the CTranslate2 model now instead of on the first translate() call
+                _packaged_model(translation)
+                elapsed = time.perf_counter() - start
+                rss_after = _process_rss()
+            if rss_before is not None and rss_after is not None and rss_after > rss_before:
+                size = rss_after - rss_before
+            else:
+                size = _model_disk_size(translation)
+
+            translation_metrics.observe_model_load(from_code, to_code, elapsed)
+            evicted = []
+            with self._lock:
+                stats = self._stats.setdefault(key, PairStats())
+                stats.loads += 1
+                stats.load_seconds += elapsed
+                # Do not publish objects resolved against a stale package set.
+                if generation == self._generation:
+                    self._translations[key] = translation
+                    stats.resident_bytes = size
+                    stats.last_used = time.monotonic()
+                    evicted = self._evict_over_budget(keep=key)
+            print(
+                f"[registry] Loaded {from_code}->{to_code} in {elapsed:.3f}s "
+                f"({size / 1048576:.0f} MiB)",
+                file=sys.stderr,
+            )
+            for pair in evicted:
+                print(f"[registry] Evicted {pair[0]}->{pair[1]} (memory budget)", file=sys.stderr)
+            self._ensure_reaper()
+            return translation
+
+    def _touch(self, key: tuple[str, str]) -> None:
+        stats = self._stats[key]
+        stats.hits += 1
+        stats.last_used = time.monotonic()
+
+    def _unload(self, key: tuple[str, str]) -> None:
+        # Caller holds self._lock; requests still holding the object finish normally
+        self._translations.pop(key, None)
+        stats = self._stats.get(key)
+        if stats is not None:
+            stats.evictions += 1
+            stats.resident_bytes = 0
+
+    def _evict_over_budget(self, keep: tuple[str, str]) -> list[tuple[str, str]]:
+        """Unload least recently used pairs until the resident models fit ARGOS_MODEL_MEMORY_MB."""
+        # Caller holds self._lock
+        budget = Config.MODEL_MEMORY_MB * 1024 * 1024
+        if budget <= 0:
+            return []
+        evicted = []
+        while sum(self._stats[pair].resident_bytes for pair in self._translations) > budget:
+            candidates = [pair for pair in self._translations if pair != keep]
+            if not candidates:
+                break
+            victim = min(candidates, key=lambda pair: self._stats[pair].last_used)
+            self._unload(victim)
+            evicted.append(victim)
+        return evicted
+
+    def evict_idle(self, max_idle: float) -> list[tuple[str, str]]:
+        """Unload pairs that have not been used for ``max_idle`` seconds."""
+        cutoff = time.monotonic() - max_idle
+        with self._lock:
+            idle = [pair for pair in self._translations if self._stats[pair].last_used < cutoff]
+            for pair in idle:
+                self._unload(pair)
+        for pair in idle:
+            print(f"[registry] Evicted {pair[0]}->{pair[1]} (idle)", file=sys.stderr)
+        return idle
+
+    def _ensure_reaper(self) -> None:
+        if Config.MODEL_IDLE_SECONDS <= 0:
+            return
+        with self._lock:
+            if self._reaper is not None and self._reaper.is_alive():
+                return
+            self._reaper = threading.Thread(
+                target=self._reap_idle, name="argos-model-reaper", daemon=True
+            )
+            self._reaper.start()
+
+    def _reap_idle(self) -> None:
+        interval = min(60.0, max(1.0, Config.MODEL_IDLE_SECONDS / 4))
+        while True:
+            time.sleep(interval)
+            self.evict_idle(Config.MODEL_IDLE_SECONDS)
+
+    def use_translations(self, translations: dict[tuple[str, str], object], names: dict[str, str]):
+        """Serve fixed translation objects instead of the installed packages.
+
+        Used by the benchmark and load-test harnesses to run without models;
+        ``names`` maps language names to codes. ``invalidate()`` returns to
+        the installed packages.
+        """
+        with self._lock:
+            self._language_map = dict(names)
+            self._package_versions = dict.fromkeys(translations, "stub")
+            self._installed_packages = []
+            self._routes = RouteTable(translations, max_hops=Config.MAX_ROUTE_HOPS)
+            self._translations = dict(translations)
+            for pair in translations:
+                self._stats.setdefault(pair, PairStats()).last_used = time.monotonic()
+            self._generation += 1
+
+    def invalidate(self) -> None:
+        """Drop all resident state after packages were installed or removed."""
+        with self._lock:
+            self._language_map = None
+            self._package_versions = {}
+            self._installed_packages = []
+            self._routes = None
+            self._translations.clear()
+            self._pair_locks.clear()
+            for stats in self._stats.values():
+                stats.resident_bytes = 0
+            self._generation += 1
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Return load time, hit, eviction and memory figures keyed by ``from->to``."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                f"{from_code}->{to_code}": {
+                    "resident": (from_code, to_code) in self._translations,
+                    "loads": s.loads,
+                    "load_seconds": round(s.load_seconds, 4),
+                    "hits": s.hits,
+                    "evictions": s.evictions,
+                    "rss_bytes": s.resident_bytes,
+                    "rss_mb": round(s.resident_bytes / 1048576, 1),
+                    "idle_seconds": round(now - s.last_used, 1) if s.last_used else None,
+                }
+                for (from_code, to_code), s in self._stats.items()
+            }
+
+    def memory(self) -> dict[str, float]:
+        """Return the model memory budget and current usage in MiB."""
+        with self._lock:
+            resident = sum(self._stats[pair].resident_bytes for pair in self._translations)
+            count = len(self._translations)
+        rss = _process_rss()
+        return {
+            "budget_mb": Config.MODEL_MEMORY_MB,
+            "resident_models": count,
+            "resident_mb": round(resident / 1048576, 1),
+            "process_rss_mb": round(rss / 1048576, 1) if rss is not None else None,
+        }
+
+
+translator_registry = TranslatorRegistry()
+
+# Extra keyword arguments for ctranslate2.Translator; override the pair's tuned
+# settings (e.g. intra_threads in pool workers)
+ct2_options: dict[str, object] = {}
+
+
+def _cache_version(from_code: str, to_code: str) -> str:
+    """Result cache version: the package version plus output-changing inference settings."""
+    version = translator_registry.package_version(from_code, to_code)
+    return f"{version}+{inference_tuning.settings(from_code, to_code).cache_tag()}"
+
+
+def _packaged_model(translation):
+    """Return (ctranslate2 translator, package) for plain Argos package translations.
+
+    Returns None for translation objects that do not expose their package
+    (e.g. composite or identity translations), which are translated one
+    sentence at a time instead.
+    """
+    # argostranslate wraps package translations in a CachedTranslation
+    translation = getattr(translation, "underlying", translation)
+    pkg = getattr(translation, "pkg", None)
+    if getattr(pkg, "tokenizer", None) is None or not hasattr(translation, "translator"):
+        return None
+    if translation.translator is None:
+        import ctranslate2
+        from argostranslate import settings
+
+        options = {
+            **inference_tuning.settings(pkg.from_code, pkg.to_code).model_options(),
+            **ct2_options,
+        }
+        # Shared with argostranslate's own code path, so the model is loaded once
+        translation.translator = ctranslate2.Translator(
+            str(pkg.package_path / "model"), device=settings.device, **options
+        )
+    return translation.translator, pkg
+
+
+def translate_sentences(
+    translation, sentences: list[str], max_batch_tokens: int, report: BatchReport | None = None
+) -> list[str]:
+    """Translate a list of sentences with batched model calls where possible."""
+    packaged = _packaged_model(translation)
+    if packaged is None:
+        if report is not None:
+            report.batches += len(sentences)
+        return [translation.translate(sentence) for sentence in sentences]
+
+    translator, pkg = packaged
+    decoding = inference_tuning.settings(pkg.from_code, pkg.to_code).decoding_options()
+    target_prefix = getattr(pkg, "target_prefix", "") or ""
+    with stage("model/tokenize"):
+        tokenized = [pkg.tokenizer.encode(sentence) for sentence in sentences]
+    results: list[str] = [""] * len(sentences)
+    for batch in make_batches([len(tokens) for tokens in tokenized], max_batch_tokens):
+        if report is not None:
+            report.batches += 1
+        with stage("model/decode"):
+            outputs = translator.translate_batch(
+                [tokenized[i] for i in batch],
+                target_prefix=[[target_prefix]] * len(batch) if target_prefix else None,
+                replace_unknowns=True,
+                max_batch_size=max_batch_tokens,
+                batch_type="tokens",
+                length_penalty=0.2,
+                **decoding,
+            )
+        with stage("model/detokenize"):
+            for i, output in zip(batch, outputs, strict=True):
+                detokenized = pkg.tokenizer.decode(output.hypotheses[0])
+                if target_prefix and detokenized.startswith(target_prefix):
+                    detokenized = detokenized[len(target_prefix):]
+                results[i] = detokenized.strip()
+    return results
+
+
+def _run_model_batch(
+    sentences: list[str], from_code: str, to_code: str, max_batch_tokens: int
+) -> tuple[list[str], int]:
+    """Run sentences through the model, in a pool worker when one is configured."""
+    pool = get_worker_pool()
+    if pool is not None:
+        return pool.translate_sentences(sentences, from_code, to_code, max_batch_tokens)
+    report = BatchReport()
+    with stage("model/translator"):
+        translation = translator_registry.get(from_code, to_code)
+    return translate_sentences(translation, sentences, max_batch_tokens, report), report.batches
+
+
+# Combines concurrent requests for a pair into shared model batches (ARGOS_MICROBATCH_WAIT_MS)
+micro_batcher = MicroBatcher(_run_model_batch)
+
+
+def _model_translate_sentences(
+    sentences: list[str], from_code: str, to_code: str, max_batch_tokens: int, report: BatchReport
+) -> list[str]:
+    # Includes the wait for a shared micro-batch or a worker process
+    with stage("model"):
+        translated, batches = micro_batcher.translate(
+            sentences, from_code, to_code, max_batch_tokens
+        )
+    report.batches += batches
+    return translated
+
+
+def _batched() -> bool:
+    """Whether texts go through the sentence-batched path.
+
+    Micro-batching and the translation memory work on sentences, so either one
+    turns it on.
+    """
+    return (
+        Config.BATCHED_TRANSLATION
+        or Config.MICROBATCH_WAIT_MS > 0
+        or translation_memory is not None
+    )
+
+
+def translate_documents(
+    texts: list[str],
+    from_code: str,
+    to_code: str,
+    max_batch_tokens: int | None = None,
+    use_cache: bool = True,
+) -> tuple[list[str], BatchReport]:
+    """Translate texts sentence by sentence in shared batches, keeping their layout.
+
+    Sentences of all texts go through the model together, so many short texts
+    fill batches as well as one long one. Sentences already in the result
+    cache or matched by the translation memory are not sent to the model.
+    """
+    start = time.perf_counter()
+    with stage("segmentation"):
+        segmented = [segment_text(text) for text in texts]
+        sentences = [
+            segment.text for segments in segmented for segment in segments if segment.translatable
+        ]
+    report = BatchReport(sentences=len(sentences))
+    translated = _translate_sentence_list(
+        sentences, from_code, to_code, report, max_batch_tokens, use_cache
+    )
+
+    outputs = []
+    offset = 0
+    with stage("segmentation"):
+        for segments in segmented:
+            count = sum(1 for segment in segments if segment.translatable)
+            outputs.append(join_segments(segments, translated[offset:offset + count]))
+            offset += count
+
+    report.seconds = time.perf_counter() - start
+    if report.sentences:
+        print(
+            f"[batch] {from_code}->{to_code}: {report.sentences} sentences "
+            f"({report.cached} cached, {report.memory} from memory, {report.batches} batches) in {report.seconds:.2f}s, "
+            f"{report.sentences_per_second:.1f} sentences/s",
+            file=sys.stderr,
+        )
+    return outputs, report
+
+
+def _translate_sentence_list(
+    sentences: list[str],
+    from_code: str,
+    to_code: str,
+    report: BatchReport,
+    max_batch_tokens: int | None = None,
+    use_cache: bool = True,
+) -> list[str]:
+    """Translate sentences with one pair's package via the result cache, memory and model."""
+    max_batch_tokens = max_batch_tokens or Config.MAX_BATCH_TOKENS
+    cache = result_cache if use_cache else None
+    memory = translation_memory if use_cache else None
+    version = _cache_version(from_code, to_code)
+
+    translated: list[str | None] = [None] * len(sentences)
+    if cache is not None:
+        with stage("cache"):
+            for i, sentence in enumerate(sentences):
+                translated[i] = cache.get(from_code, to_code, version, sentence)
+    missing = [i for i, value in enumerate(translated) if value is None]
+    report.cached += len(sentences) - len(missing)
+
+    if memory is not None and missing:
+        with stage("memory"):
+            for i in missing:
+                match = memory.lookup(from_code, to_code, sentences[i], version)
+                if match is not None:
+                    translated[i] = match.target
+                    report.memory += 1
+                    # A fuzzy match is only right for this sentence while the memory
+                    # serves it, so only exact matches become exact cache entries
+                    if cache is not None and match.score >= 1.0:
+                        cache.put(from_code, to_code, version, sentences[i], match.target)
+        missing = [i for i in missing if translated[i] is None]
+
+    if missing:
+        todo = [sentences[i] for i in missing]
+        results = _model_translate_sentences(todo, from_code, to_code, max_batch_tokens, report)
+        with stage("cache"):
+            for i, result in zip(missing, results, strict=True):
+                translated[i] = result
+                if cache is not None:
+                    cache.put(from_code, to_code, version, sentences[i], result)
+        if memory is not None:
+            with stage("memory"):
+                memory.add(from_code, to_code, zip(todo, results, strict=True), version=version)
+    return translated
+
+
+def translate_document(
+    text: str,
+    from_code: str,
+    to_code: str,
+    max_batch_tokens: int | None = None,
+    use_cache: bool = True,
+) -> tuple[str, BatchReport]:
+    """Translate one text sentence by sentence in batches, keeping its layout."""
+    outputs, report = translate_documents(
+        [text], from_code, to_code, max_batch_tokens=max_batch_tokens, use_cache=use_cache
+    )
+    return outputs[0], report
+
+
+def translate_uncached(text: str, from_code: str, to_code: str) -> str:
+    """Translate text in this process without consulting the result cache."""
+    if _batched():
+        result, _report = translate_document(text, from_code, to_code, use_cache=False)
+        return result
+    with stage("model/translator"):
+        translation = translator_registry.get(from_code, to_code)
+    # argostranslate splits, tokenizes and decodes internally (see ARGOS_PROFILE_SLOW_MS)
+    with stage("model/argos"):
+        return translation.translate(text)
+
+
+def translate(
+    text: str, from_code: str, to_code: str, report: RouteReport | None = None
+) -> str:
+    """Translate text between two language codes along the cheapest installed route.
+
+    Pairs without a direct package are translated hop by hop through pivot
+    languages; each hop is served from the result cache where possible.
+    """
+    with translation_metrics.track(from_code, to_code, len(text)) as chars_out:
+        result = _translate_routed(text, from_code, to_code, report)
+        chars_out.append(len(result))
+    return result
+
+
+def _translate_routed(
+    text: str, from_code: str, to_code: str, report: RouteReport | None = None
+) -> str:
+    with stage("route"):
+        route = translator_registry.route(from_code, to_code)
+    seconds = []
+    for hop_from, hop_to in route.hops:
+        start = time.perf_counter()
+        text = _translate_direct(text, hop_from, hop_to)
+        seconds.append(time.perf_counter() - start)
+    if report is not None:
+        report.record(route, seconds)
+    return text
+
+
+def _translate_direct(text: str, from_code: str, to_code: str) -> str:
+    """Translate with the pair's own package, serving repeats from the result cache."""
+    with stage("cache"):
+        version = _cache_version(from_code, to_code)
+        cached = (
+            result_cache.get(from_code, to_code, version, text)
+            if result_cache is not None
+            else None
+        )
+    if cached is not None:
+        return cached
+
+    if _batched():
+        result, _report = translate_document(text, from_code, to_code)
+    else:
+        with stage("model"):
+            pool = get_worker_pool()
+            if pool is not None:
+                result = pool.translate_text(text, from_code, to_code)
+            else:
+                result = translate_uncached(text, from_code, to_code)
+
+    if result_cache is not None:
+        with stage("cache"):
+            result_cache.put(from_code, to_code, version, text, result)
+    return result
+
+
+def translate_many(
+    texts: list[str], from_code: str, to_code: str, report: RouteReport | None = None
+) -> list[str]:
+    """Translate a batch of texts, sharing model batches or worker processes between them.
+
+    Empty and whitespace-only texts are returned unchanged. Pivoted pairs are
+    translated one hop at a time for the whole batch.
+    """
+    chars_in = sum(len(text) for text in texts)
+    with translation_metrics.track(from_code, to_code, chars_in) as chars_out:
+        results = _translate_many_routed(texts, from_code, to_code, report)
+        chars_out.append(sum(len(result) for result in results))
+    return results
+
+
+def _translate_many_routed(
+    texts: list[str], from_code: str, to_code: str, report: RouteReport | None = None
+) -> list[str]:
+    route = translator_registry.route(from_code, to_code)
+    seconds = []
+    for hop_from, hop_to in route.hops:
+        start = time.perf_counter()
+        texts = _translate_many_direct(texts, hop_from, hop_to)
+        seconds.append(time.perf_counter() - start)
+    if report is not None:
+        report.record(route, seconds)
+    return texts
+
+
+def _translate_many_direct(texts: list[str], from_code: str, to_code: str) -> list[str]:
+    results: list[str | None] = [text if not text.strip() else None for text in texts]
+    version = _cache_version(from_code, to_code)
+    if result_cache is not None:
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                results[i] = result_cache.get(from_code, to_code, version, text)
+    missing = [i for i, value in enumerate(results) if value is None]
+    if not missing:
+        return results
+
+    todo = [texts[i] for i in missing]
+    pool = get_worker_pool()
+    if _batched():
+        translated, _report = translate_documents(todo, from_code, to_code)
+    elif pool is not None and len(todo) > 1:
+        with ThreadPoolExecutor(max_workers=min(len(todo), pool.size)) as executor:
+            translated = list(
+                executor.map(lambda text: pool.translate_text(text, from_code, to_code), todo)
+            )
+    else:
+        translated = [translate_uncached(text, from_code, to_code) for text in todo]
+
+    for i, result in zip(missing, translated, strict=True):
+        results[i] = result
+        if result_cache is not None:
+            result_cache.put(from_code, to_code, version, texts[i], result)
+    return results
+
+
+def translate_stream(
+    text: str, from_code: str, to_code: str, report: RouteReport | None = None
+) -> Iterator[str]:
+    """Translate text paragraph by paragraph, yielding each finished paragraph.
+
+    Yielded chunks keep the paragraph's surrounding whitespace, so joining
+    them reproduces the source layout. Time to first output is recorded in
+    ``stream_timings``.
+    """
+    start = time.perf_counter()
+    first_output = None
+    paragraphs = 0
+    # The whole stream counts as one request in the metrics
+    with translation_metrics.track(from_code, to_code, len(text)) as chars_out:
+        with stage("segmentation"):
+            chunks = split_paragraphs(text)
+        for chunk in chunks:
+            core = chunk.strip()
+            if not core:
+                yield chunk
+                continue
+            lead = chunk[: len(chunk) - len(chunk.lstrip())]
+            trail = chunk[len(chunk.rstrip()):]
+            translated = _translate_routed(core, from_code, to_code, report)
+            chars_out.append(len(translated))
+            paragraphs += 1
+            if first_output is None:
+                first_output = time.perf_counter() - start
+            yield f"{lead}{translated}{trail}"
+
+    if first_output is not None:
+        timing = StreamTiming(
+            pair=f"{from_code}->{to_code}",
+            paragraphs=paragraphs,
+            first_output_seconds=first_output,
+            total_seconds=time.perf_counter() - start,
+        )
+        stream_timings.append(timing)
+        print(
+            f"[stream] {timing.pair}: first output after {timing.first_output_seconds:.2f}s, "
+            f"{timing.paragraphs} paragraphs in {timing.total_seconds:.2f}s",
+            file=sys.stderr,
+        )
+
+
+class _SharedHops:
+    """Sentence translations along route prefixes, computed once per fan-out.
+
+    Targets reached through the same pivot (``fr -> en -> de`` and
+    ``fr -> en -> es``) share the ``fr -> en`` hop instead of running it twice.
+    """
+
+    def __init__(self, from_code: str, sentences: list[str]) -> None:
+        self._lock = threading.Lock()
+        done: Future = Future()
+        done.set_result(sentences)
+        self._results: dict[tuple[str, ...], Future] = {(from_code,): done}
+
+    def translate(self, path: tuple[str, ...], report: BatchReport) -> list[str]:
+        """Return the sentences translated along ``path``; the last hop runs once."""
+        with self._lock:
+            future = self._results.get(path)
+            owner = future is None
+            if owner:
+                future = self._results[path] = Future()
+        if owner:
+            try:
+                source = self.translate(path[:-1], report)
+                future.set_result(_translate_sentence_list(source, path[-2], path[-1], report))
+            except Exception as e:
+                future.set_exception(e)
+        return future.result()
+
+
+def fanout_workers() -> int:
+    """Targets translated at once: ARGOS_FANOUT_WORKERS, else one per worker process."""
+    if Config.FANOUT_WORKERS > 0:
+        return Config.FANOUT_WORKERS
+    pool = get_worker_pool()
+    return pool.size if pool is not None else 2
+
+
+def translate_fanout(
+    texts: list[str], from_code: str, to_codes: list[str], max_workers: int | None = None
+) -> Iterator[FanoutResult]:
+    """Translate texts into several target languages, yielding each target as it completes.
+
+    The texts are segmented once and the targets run concurrently (at most
+    ``fanout_workers()`` at a time), each through its cheapest route. A target
+    that fails is yielded with ``error`` set; the others are unaffected.
+    """
+    start = time.perf_counter()
+    segmented = [segment_text(text) for text in texts]
+    sentences = [
+        segment.text for segments in segmented for segment in segments if segment.translatable
+    ]
+    hops = _SharedHops(from_code, sentences)
+    targets = list(dict.fromkeys(to_codes))
+    chars_in = sum(len(text) for text in texts)
+
+    def run(to_code: str) -> FanoutResult:
+        result = FanoutResult(to_code, batch=BatchReport(sentences=len(sentences)))
+        target_start = time.perf_counter()
+        with translation_metrics.track(from_code, to_code, chars_in) as chars_out:
+            route = translator_registry.route(from_code, to_code)
+            path = (from_code,)
+            seconds = []
+            for _hop_from, hop_to in route.hops:
+                hop_start = time.perf_counter()
+                path += (hop_to,)
+                translated = hops.translate(path, result.batch)
+                seconds.append(time.perf_counter() - hop_start)
+            result.report.record(route, seconds)
+            outputs = []
+            offset = 0
+            for segments in segmented:
+                count = sum(1 for segment in segments if segment.translatable)
+                outputs.append(join_segments(segments, translated[offset:offset + count]))
+                offset += count
+            chars_out.append(sum(len(output) for output in outputs))
+        result.texts = outputs
+        result.seconds = result.batch.seconds = time.perf_counter() - target_start
+        return result
+
+    if not targets:
+        return
+    workers = max(1, min(max_workers or fanout_workers(), len(targets)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argos-fanout") as executor:
+        futures = {executor.submit(run, to_code): to_code for to_code in targets}
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:
+                yield FanoutResult(futures[future], error=e, seconds=time.perf_counter() - start)
+    print(
+        f"[fanout] {from_code}->{','.join(targets)}: {len(sentences)} sentences, "
+        f"{len(targets)} targets in {time.perf_counter() - start:.2f}s ({workers} at once)",
+        file=sys.stderr,
+    )
@@ -69,37 +69,53 @@ def ensure_language_packages() -> None:
         f"""
         import argostranslate.package
 
-        LANGUAGE_PAIRS = {LANGUAGE_PAIRS!r}
+        from package_downloads import install_packages
+        from package_index import package_index
 
-        def ensure_pair(from_code: str, to_code: str) -> None:
-            installed = [
-                pkg for pkg in argostranslate.package.get_installed_packages()
-                if pkg.from_code == from_code and pkg.to_code == to_code
-            ]
-            human = f"{{from_code}}->{{to_code}}"
-            if installed:
-                print(f"[info] Argos package {{human}} already installed.")
-                return
-
-            print(f"[info] Downloading Argos package {{human}}... this might take a moment.")
-            argostranslate.package.update_package_index()
-            available = argostranslate.package.get_available_packages()
-            try:
-                package_to_install = next(
-                    pkg for pkg in available
-                    if pkg.from_code == from_code and pkg.to_code == to_code
-                )
-            except StopIteration as exc:
-                raise RuntimeError(f"Could not find {{human}} package in package index.") from exc
-            argostranslate.package.install_from_path(package_to_install.download())
-            print(f"[info] Argos package {{human}} installed.")
+        LANGUAGE_PAIRS = {LANGUAGE_PAIRS!r}
 
+        installed = {{
+            (pkg.from_code, pkg.to_code)
+            for pkg in argostranslate.package.get_installed_packages()
+        }}
+        missing = [pair for pair in LANGUAGE_PAIRS if pair not in installed]
         for from_code, to_code in LANGUAGE_PAIRS:
-            ensure_pair(from_code, to_code)
+            if (from_code, to_code) in installed:
+                print(f"[info] Argos package {{from_code}}->{{to_code}} already installed.")
+
+        if missing:
+            print("[info] Downloading Argos packages... this might take a moment.")
+            # Honours ARGOS_PACKAGE_MIRROR and ARGOS_OFFLINE; keeps the local copy on failure
+            package_index.refresh()
+            available = package_index.available_packages()
+            to_install = []
+            for from_code, to_code in missing:
+                try:
+                    to_install.append(next(
+                        pkg for pkg in available
+                        if pkg.from_code == from_code and pkg.to_code == to_code
+                    ))
+                except StopIteration as exc:
+                    raise RuntimeError(
+                        f"Could not find {{from_code}}->{{to_code}} package in package index."
+                    ) from exc
+
+            # Same path as the UI: parallel resumable downloads, sequential installs
+            failed = []
+            for event in install_packages(to_install):
+                human = f"{{event.pkg.from_code}}->{{event.pkg.to_code}}"
+                if event.stage == "installed":
+                    print(f"[info] Argos package {{human}} installed.")
+                elif event.stage == "failed":
+                    failed.append(human)
+                    print(f"[error] Argos package {{human}} failed: {{event.error}}")
+            if failed:
+                raise SystemExit(f"Could not install: {{', '.join(failed)}}")
         """
     ).strip()
 
-    run([str(python_bin), "-c", script])
+    # Run from the repository root so the script can import package_downloads
+    run([str(python_bin), "-c", script], cwd=REPO_ROOT)
 
 
 def parse_args() -> argparse.Namespace:
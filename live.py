@@ -0,0 +1,93 @@
+"""Incremental translation for translate-as-you-type.
+
+A ``LiveSession`` remembers the translation of every sentence of the text it
+last translated. On each update the new text is split into sentences, and
+only sentences that were added or changed since then go to the model; all
+others reuse their previous translation. Editing one sentence of a long text
+therefore costs one sentence of inference. Sessions are per browser session
+in the UI and hold no model state, so they are cheap to create.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+
+from engine import RouteReport, translate_many
+from segmentation import join_segments, segment_text
+
+
+@dataclass
+class LiveUpdate:
+    """Result of one incremental translation."""
+
+    text: str
+    sentences: int
+    translated: int
+    reused: int
+    seconds: float
+    report: RouteReport
+
+
+class LiveSession:
+    """Per-session sentence translations and the debounce revision counter."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._pair: tuple[str, str] | None = None
+        self._translations: dict[str, str] = {}
+        self.revision = 0
+
+    def __deepcopy__(self, memo) -> LiveSession:
+        # Gradio deep-copies State defaults per browser session; each gets an empty session
+        return LiveSession()
+
+    def submit(self) -> int:
+        """Register an edit and return its revision; later edits supersede it."""
+        with self._lock:
+            self.revision += 1
+            return self.revision
+
+    def is_latest(self, revision: int) -> bool:
+        return revision == self.revision
+
+    def update(
+        self, text: str, from_code: str, to_code: str, revision: int | None = None
+    ) -> LiveUpdate | None:
+        """Translate ``text``, sending only new or changed sentences to the model.
+
+        Returns None without translating if ``revision`` was superseded while
+        waiting for a previous update of this session to finish.
+        """
+        with self._lock:
+            if revision is not None and revision != self.revision:
+                return None
+            start = time.perf_counter()
+            if self._pair != (from_code, to_code):
+                self._pair = (from_code, to_code)
+                self._translations = {}
+            segments = segment_text(text)
+            sentences = [segment.text for segment in segments if segment.translatable]
+            # dict.fromkeys keeps order and sends repeated sentences once
+            changed = [s for s in dict.fromkeys(sentences) if s not in self._translations]
+            report = RouteReport()
+            if changed:
+                self._translations.update(
+                    zip(changed, translate_many(changed, from_code, to_code, report), strict=True)
+                )
+            # Forget sentences that were edited away, so the session stays the size of the text
+            self._translations = {s: self._translations[s] for s in sentences}
+            output = join_segments(segments, [self._translations[s] for s in sentences])
+            return LiveUpdate(
+                text=output,
+                sentences=len(sentences),
+                translated=len(changed),
+                reused=len(sentences) - len(changed),
+                seconds=time.perf_counter() - start,
+                report=report,
+            )
+
+    def reset(self) -> None:
+        with self._lock:
+            self._pair = None
+            self._translations = {}
@@ -0,0 +1,305 @@
+"""Local load test against the web UI or the JSON API.
+
+``cindergrace-argos loadtest`` starts the app in this process (the Gradio UI
+from ``build_app()`` or the API server), fires a fixed number of translation
+requests from concurrent clients and reports throughput, tail latency and
+how much of the latency was spent waiting versus translating. Compute time
+is measured around the request handler inside the server; the rest of the
+client-side latency is queueing and transport. With ``--stub`` no models are
+needed, so it runs fully offline.
+"""
+from __future__ import annotations
+
+import argparse
+import functools
+import inspect
+import json
+import random
+import socket
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmark import CORPORA, build_corpus, install_stub_translator, peak_rss_mb, percentile
+
+
+class ComputeTimer:
+    """Collects server-side handler durations from wrapped functions."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.samples: list[float] = []
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self.samples.append(seconds)
+
+    def wrap(self, fn):
+        """Time ``fn`` (plain or generator function) while keeping its name for Gradio."""
+        if inspect.isgeneratorfunction(fn):
+
+            @functools.wraps(fn)
+            def timed_generator(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    yield from fn(*args, **kwargs)
+                finally:
+                    self.add(time.perf_counter() - start)
+
+            return timed_generator
+
+        @functools.wraps(fn)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.add(time.perf_counter() - start)
+
+        return timed
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def parse_mix(spec: str) -> dict[str, int]:
+    """Parse ``short=70,medium=25,long=5`` into corpus weights."""
+    mix = {}
+    for item in spec.split(","):
+        name, _sep, weight = item.strip().partition("=")
+        if name not in CORPORA:
+            raise ValueError(f"Unknown text length '{name}', expected one of {', '.join(CORPORA)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+def parse_pairs(spec: str) -> list[tuple[str, str]]:
+    pairs = []
+    for item in spec.split(","):
+        from_code, sep, to_code = item.strip().partition(":")
+        if not sep:
+            raise ValueError(f"Invalid pair '{item}', expected from:to")
+        pairs.append((from_code, to_code))
+    return pairs
+
+
+def build_requests(
+    count: int, mix: dict[str, int], pairs: list[tuple[str, str]], seed: int
+) -> list[tuple[str, str, str, str]]:
+    """Return (length, text, from_code, to_code) tuples, identical for the same seed."""
+    rng = random.Random(seed)
+    corpora = {name: build_corpus(name) for name in mix}
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    requests = []
+    for _ in range(count):
+        name = rng.choices(names, weights)[0]
+        from_code, to_code = rng.choice(pairs)
+        requests.append((name, rng.choice(corpora[name]), from_code, to_code))
+    return requests
+
+
+def start_api(timer: ComputeTimer) -> str:
+    """Start the JSON API in a background thread and return its base URL."""
+    import api
+    from config import Config
+
+    Config.API_PORT = _free_port()
+    api.translate_request = timer.wrap(api.translate_request)
+    api.run_api_server(background=True, log_level="warning")
+    url = f"http://{Config.get_server_bind()}:{Config.API_PORT}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{url}/health", timeout=1)
+            return url
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError("API server did not start")
+
+
+def start_ui(timer: ComputeTimer) -> tuple[str, str]:
+    """Build and launch the Gradio app; returns its URL and the translate endpoint name."""
+    import app
+    from config import Config
+
+    app.translate_text = timer.wrap(app.translate_text)
+    app.translate_text_stream = timer.wrap(app.translate_text_stream)
+    demo = app.build_app()
+    demo.launch(
+        server_name=Config.get_server_bind(),
+        server_port=_free_port(),
+        prevent_thread_lock=True,
+        quiet=True,
+    )
+    endpoint = "/translate_text_stream" if Config.STREAM_TRANSLATION else "/translate_text"
+    return demo.local_url, endpoint
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="cindergrace-argos loadtest",
+        description="Fire concurrent translation requests at a locally started app.",
+    )
+    parser.add_argument("--target", choices=["api", "ui"], default="api")
+    parser.add_argument("--requests", type=int, default=200, help="Total requests (default: 200)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients")
+    parser.add_argument(
+        "--mix", default="short=70,medium=25,long=5", help="Text length weights"
+    )
+    parser.add_argument("--pairs", default="en:de,de:en", help="Language pairs to pick from")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for the request sequence")
+    parser.add_argument("--stub", action="store_true", help="Use the stub translator")
+    parser.add_argument(
+        "--stub-delay-ms",
+        type=float,
+        default=5.0,
+        help="Simulated model time per sentence in stub mode (default: 5)",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Keep the result cache and translation memory enabled",
+    )
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file")
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+        pairs = parse_pairs(args.pairs)
+    except ValueError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    from config import Config
+
+    if args.stub:
+        Config.WORKERS = 0
+    import engine
+
+    if not args.cache:
+        engine.result_cache = None
+        engine.translation_memory = None
+    if args.stub:
+        install_stub_translator(args.stub_delay_ms / 1000)
+    names = {code: name for name, code in engine.translator_registry.language_map().items()}
+    for from_code, to_code in pairs:
+        if from_code not in names or to_code not in names:
+            print(f"error: {from_code} -> {to_code} is not installed", file=sys.stderr)
+            return 2
+
+    timer = ComputeTimer()
+    requests = build_requests(args.requests, mix, pairs, args.seed)
+    local = threading.local()
+
+    if args.target == "api":
+        url = start_api(timer)
+
+        def send(text: str, from_code: str, to_code: str) -> None:
+            body = json.dumps({"q": text, "source": from_code, "target": to_code}).encode()
+            request = urllib.request.Request(
+                f"{url}/translate", data=body, headers={"Content-Type": "application/json"}
+            )
+            with urllib.request.urlopen(request, timeout=300) as response:
+                response.read()
+
+    else:
+        from gradio_client import Client
+
+        url, endpoint = start_ui(timer)
+
+        def send(text: str, from_code: str, to_code: str) -> None:
+            if not hasattr(local, "client"):
+                local.client = Client(url, verbose=False)
+            local.client.predict(text, names[from_code], names[to_code], api_name=endpoint)
+
+    latencies: list[float] = []
+    errors: list[str] = []
+    lock = threading.Lock()
+
+    def run(item: tuple[str, str, str, str]) -> None:
+        _name, text, from_code, to_code = item
+        start = time.perf_counter()
+        try:
+            send(text, from_code, to_code)
+        except Exception as e:
+            with lock:
+                errors.append(f"{type(e).__name__}: {e}")
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    # One warmup request per pair loads the models before timing starts
+    for from_code, to_code in pairs:
+        run(("warmup", "Hello world.", from_code, to_code))
+    latencies.clear()
+    timer.samples.clear()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(run, requests))
+    wall = time.perf_counter() - start
+
+    def summary(values: list[float]) -> dict[str, float]:
+        return {
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "max_ms": round(max(values, default=0.0) * 1000, 2),
+            "mean_ms": round(sum(values) / len(values) * 1000, 2) if values else 0.0,
+        }
+
+    # Joined workers become reaped children, so peak_rss_mb() includes their model memory
+    pool = engine.get_worker_pool()
+    if pool is not None:
+        pool.shutdown()
+    latency = summary(latencies)
+    compute = summary(timer.samples)
+    chars = sum(len(item[1]) for item in requests)
+    report = {
+        "target": args.target,
+        "mode": "stub" if args.stub else "models",
+        "requests": len(requests),
+        "concurrency": args.concurrency,
+        "mix": mix,
+        "pairs": [f"{f}->{t}" for f, t in pairs],
+        "settings": {
+            "workers": Config.WORKERS,
+            "threads_per_worker": Config.THREADS_PER_WORKER,
+            "batched": Config.BATCHED_TRANSLATION,
+            "microbatch_wait_ms": Config.MICROBATCH_WAIT_MS,
+            "ui_concurrency": Config.UI_CONCURRENCY,
+            "cache": args.cache,
+        },
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "throughput_chars_per_second": round(chars / wall, 1) if wall else 0.0,
+        "errors": len(errors),
+        "latency": latency,
+        "compute": compute,
+        # Client latency not spent in the handler: queueing, transport and serialization
+        "queue_mean_ms": round(max(0.0, latency["mean_ms"] - compute["mean_ms"]), 2),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+    print(
+        f"[loadtest] {args.target} {len(latencies)}/{len(requests)} ok in {wall:.2f}s, "
+        f"{report['throughput_rps']} req/s, p50 {latency['p50_ms']} ms, "
+        f"p95 {latency['p95_ms']} ms, p99 {latency['p99_ms']} ms; "
+        f"compute mean {compute['mean_ms']} ms, queue mean {report['queue_mean_ms']} ms",
+        file=sys.stderr,
+    )
+    for error in sorted(set(errors))[:5]:
+        print(f"[loadtest] error: {error}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+    return 1 if errors else 0
@@ -0,0 +1,269 @@
+"""In-process translation metrics in the Prometheus text format.
+
+Counters and histograms are plain dictionaries behind one lock, so recording
+a request costs a few dictionary updates. Gauges for resident models, worker
+queues and the result cache are read from their owners when ``/metrics`` is
+scraped. Everything is a no-op unless ``ARGOS_METRICS`` is enabled.
+"""
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+from config import Config
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+MODEL_LOAD_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count for one label set."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        # counts[i] is the number of values in (buckets[i-1], buckets[i]]
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> Iterator[str]:
+        cumulative = 0
+        sep = "," if labels else ""
+        for bound, count in zip(self.buckets, self.counts, strict=True):
+            cumulative += count
+            yield f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum:.6f}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+def _labels(**values: str) -> str:
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in values.items())
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class TranslationMetrics:
+    """Per-pair request, error, character and model load metrics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.requests: dict[tuple[str, str], int] = defaultdict(int)
+        self.errors: dict[tuple[str, str, str], int] = defaultdict(int)
+        self.chars_in: dict[tuple[str, str], int] = defaultdict(int)
+        self.chars_out: dict[tuple[str, str], int] = defaultdict(int)
+        self.in_progress: dict[tuple[str, str], int] = defaultdict(int)
+        self.latency: dict[tuple[str, str], Histogram] = {}
+        self.model_loads: dict[tuple[str, str], Histogram] = {}
+        self.batch_requests: dict[tuple[str, str], Histogram] = {}
+        self.batch_sentences: dict[tuple[str, str], Histogram] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return Config.METRICS_ENABLED
+
+    @contextmanager
+    def track(self, from_code: str, to_code: str, chars_in: int) -> Iterator[list[int]]:
+        """Time one request; append output character counts to the yielded list."""
+        if not self.enabled:
+            yield []
+            return
+        pair = (from_code, to_code)
+        chars_out: list[int] = []
+        with self._lock:
+            self.in_progress[pair] += 1
+        start = time.perf_counter()
+        try:
+            yield chars_out
+        except Exception as e:
+            with self._lock:
+                self.errors[(*pair, type(e).__name__)] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.in_progress[pair] -= 1
+                self.requests[pair] += 1
+                self.chars_in[pair] += chars_in
+                self.chars_out[pair] += sum(chars_out)
+                histogram = self.latency.get(pair)
+                if histogram is None:
+                    histogram = self.latency[pair] = Histogram(LATENCY_BUCKETS)
+                histogram.observe(elapsed)
+
+    def observe_model_load(self, from_code: str, to_code: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        pair = (from_code, to_code)
+        with self._lock:
+            histogram = self.model_loads.get(pair)
+            if histogram is None:
+                histogram = self.model_loads[pair] = Histogram(MODEL_LOAD_BUCKETS)
+            histogram.observe(seconds)
+
+    def observe_micro_batch(
+        self, from_code: str, to_code: str, requests: int, sentences: int
+    ) -> None:
+        """Record the size of one micro-batch run by the scheduler."""
+        if not self.enabled:
+            return
+        pair = (from_code, to_code)
+        with self._lock:
+            for values, value in (
+                (self.batch_requests, requests),
+                (self.batch_sentences, sentences),
+            ):
+                histogram = values.get(pair)
+                if histogram is None:
+                    histogram = values[pair] = Histogram(BATCH_SIZE_BUCKETS)
+                histogram.observe(value)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        out: list[str] = []
+
+        def counter(name: str, help_text: str, values: dict) -> None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} counter")
+            for (from_code, to_code, *rest), value in sorted(values.items()):
+                extra = {"type": rest[0]} if rest else {}
+                labels = _labels(source=from_code, target=to_code, **extra)
+                out.append(f"{name}{{{labels}}} {value}")
+
+        def histograms(name: str, help_text: str, values: dict) -> None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} histogram")
+            for (from_code, to_code), histogram in sorted(values.items()):
+                out.extend(histogram.lines(name, _labels(source=from_code, target=to_code)))
+
+        def gauge(name: str, help_text: str, samples: list[tuple[str, float]]) -> None:
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} gauge")
+            out.extend(
+                f"{name}{{{labels}}} {value}" if labels else f"{name} {value}"
+                for labels, value in samples
+            )
+
+        with self._lock:
+            counter("argos_translation_requests_total", "Translation requests.", self.requests)
+            counter("argos_translation_errors_total", "Failed translation requests.", self.errors)
+            counter(
+                "argos_translation_input_characters_total", "Characters received.", self.chars_in
+            )
+            counter(
+                "argos_translation_output_characters_total", "Characters returned.", self.chars_out
+            )
+            histograms(
+                "argos_translation_duration_seconds", "Translation request latency.", self.latency
+            )
+            histograms(
+                "argos_model_load_seconds", "Time to load a pair's model.", self.model_loads
+            )
+            histograms(
+                "argos_micro_batch_requests",
+                "Requests combined into one micro-batch.",
+                self.batch_requests,
+            )
+            histograms(
+                "argos_micro_batch_sentences",
+                "Sentences per micro-batch.",
+                self.batch_sentences,
+            )
+            gauge(
+                "argos_translation_in_progress",
+                "Requests currently being translated.",
+                [
+                    (_labels(source=f, target=t), value)
+                    for (f, t), value in sorted(self.in_progress.items())
+                ],
+            )
+
+        # Read from their owners at scrape time
+        from engine import translator_registry
+        from result_cache import result_cache
+        from translation_memory import translation_memory
+        from worker_pool import get_worker_pool
+
+        pair_stats = translator_registry.stats()
+        resident = sum(1 for s in pair_stats.values() if s["resident"])
+        gauge("argos_resident_models", "Models resident in this process.", [("", resident)])
+
+        def pair_labels(pair: str) -> str:
+            from_code, _sep, to_code = pair.partition("->")
+            return _labels(source=from_code, target=to_code)
+
+        gauge(
+            "argos_model_resident_bytes",
+            "Memory attributed to each resident model.",
+            [
+                (pair_labels(pair), s["rss_bytes"])
+                for pair, s in sorted(pair_stats.items())
+                if s["resident"]
+            ],
+        )
+        out.append("# HELP argos_model_evictions_total Models unloaded by budget or idle timeout.")
+        out.append("# TYPE argos_model_evictions_total counter")
+        out.extend(
+            f"argos_model_evictions_total{{{pair_labels(pair)}}} {s['evictions']}"
+            for pair, s in sorted(pair_stats.items())
+        )
+        pool = get_worker_pool()
+        if pool is not None:
+            workers = pool.stats()
+            gauge(
+                "argos_worker_queue_depth",
+                "Jobs queued or running per worker process.",
+                [(_labels(worker=str(w["worker"])), w["pending"]) for w in workers],
+            )
+            gauge(
+                "argos_worker_resident_models",
+                "Pairs loaded per worker process.",
+                [(_labels(worker=str(w["worker"])), len(w["pairs"])) for w in workers],
+            )
+        if result_cache is not None:
+            stats = result_cache.stats()
+            for key, kind, help_text in (
+                ("hits_total", "counter", "Result cache hits (memory and disk)."),
+                ("disk_hits_total", "counter", "Result cache hits served from disk."),
+                ("misses_total", "counter", "Result cache misses."),
+                ("memory_entries", "gauge", "Entries in the memory tier."),
+                ("disk_bytes", "gauge", "Bytes stored in the disk tier."),
+            ):
+                name = f"argos_cache_{key}"
+                out.append(f"# HELP {name} {help_text}")
+                out.append(f"# TYPE {name} {kind}")
+                out.append(f"{name} {stats[key.removesuffix('_total')]}")
+        if translation_memory is not None:
+            stats = translation_memory.stats()
+            for key, kind, help_text in (
+                ("exact_hits_total", "counter", "Sentences served by an exact memory match."),
+                ("fuzzy_hits_total", "counter", "Sentences served by a fuzzy memory match."),
+                ("misses_total", "counter", "Sentences without a memory match."),
+                ("entries", "gauge", "Sentence pairs stored in the translation memory."),
+            ):
+                name = f"argos_memory_{key}"
+                out.append(f"# HELP {name} {help_text}")
+                out.append(f"# TYPE {name} {kind}")
+                out.append(f"{name} {stats[key.removesuffix('_total')]}")
+        return "\n".join(out) + "\n"
+
+
+translation_metrics = TranslationMetrics()
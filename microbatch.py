@@ -0,0 +1,103 @@
+"""Micro-batching of concurrent translation requests per language pair.
+
+Without it, every request is its own model batch, so many users translating
+short snippets in the same pair at once each pay for a full ``translate_batch``
+call. The first request to arrive for a pair opens a batch and waits up to
+``ARGOS_MICROBATCH_WAIT_MS`` for others; the batch closes early once it holds
+``ARGOS_MICROBATCH_MAX_REQUESTS`` requests or about ``ARGOS_MAX_BATCH_TOKENS``
+tokens. The opening request then runs the collected sentences as one batch
+and hands every caller its own slice of the results.
+"""
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future
+
+from config import Config
+from metrics import translation_metrics
+
+# (sentences, from_code, to_code, max_batch_tokens) -> (translations, model batches)
+RunBatch = Callable[[list[str], str, str, int], tuple[list[str], int]]
+
+
+def estimate_tokens(sentence: str) -> int:
+    """Rough subword count used for the batch budget (about four characters per token)."""
+    return len(sentence) // 4 + 1
+
+
+class _PendingBatch:
+    """Requests collected for one pair while the batch is open."""
+
+    def __init__(self) -> None:
+        self.requests: list[tuple[list[str], Future]] = []
+        self.tokens = 0
+        self.full = threading.Event()
+
+
+class MicroBatcher:
+    """Collects concurrent sentence lists per pair and runs them as one batch."""
+
+    def __init__(self, run: RunBatch) -> None:
+        self._run = run
+        self._lock = threading.Lock()
+        self._open: dict[tuple[str, str], _PendingBatch] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return Config.MICROBATCH_WAIT_MS > 0
+
+    def translate(
+        self, sentences: list[str], from_code: str, to_code: str, max_batch_tokens: int
+    ) -> tuple[list[str], int]:
+        """Translate ``sentences`` together with concurrent requests for the same pair.
+
+        Returns the translations and the number of model batches the shared
+        batch needed.
+        """
+        if not self.enabled or not sentences:
+            return self._run(sentences, from_code, to_code, max_batch_tokens)
+
+        key = (from_code, to_code)
+        future: Future = Future()
+        tokens = sum(estimate_tokens(sentence) for sentence in sentences)
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._open[key] = _PendingBatch()
+            batch.requests.append((sentences, future))
+            batch.tokens += tokens
+            if (
+                len(batch.requests) >= Config.MICROBATCH_MAX_REQUESTS
+                or batch.tokens >= max_batch_tokens
+            ):
+                # Closed here so later requests open a new batch
+                self._open.pop(key, None)
+                batch.full.set()
+
+        if leader:
+            batch.full.wait(Config.MICROBATCH_WAIT_MS / 1000)
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+            self._execute(batch, from_code, to_code, max_batch_tokens)
+        return future.result()
+
+    def _execute(
+        self, batch: _PendingBatch, from_code: str, to_code: str, max_batch_tokens: int
+    ) -> None:
+        combined = [sentence for sentences, _future in batch.requests for sentence in sentences]
+        try:
+            translated, batches = self._run(combined, from_code, to_code, max_batch_tokens)
+        except Exception as e:
+            for _sentences, future in batch.requests:
+                future.set_exception(e)
+            return
+        translation_metrics.observe_micro_batch(
+            from_code, to_code, len(batch.requests), len(combined)
+        )
+        offset = 0
+        for sentences, future in batch.requests:
+            future.set_result((translated[offset:offset + len(sentences)], batches))
+            offset += len(sentences)
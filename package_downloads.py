@@ -0,0 +1,342 @@
+"""Concurrent, resumable download and staged, atomic install of Argos packages.
+
+Archives come from the package store (see ``package_store.py``) when it has
+them. Downloads run in a bounded thread pool and continue partial ``.part``
+files with HTTP range requests. Each finished archive is verified (against the
+index checksum when the index provides one, and always as a readable zip)
+and extracted into a staging directory next to the package directory, still
+in the download thread. Installing is then a rename into the package
+directory, done under argostranslate's package lock so a concurrent scan
+never sees a half-extracted package; an upgrade exchanges the old and new
+directory atomically where the platform supports it. Replaced and
+uninstalled packages are moved aside rather than deleted, so translations
+that still hold the old model finish normally; they are purged later.
+"""
+from __future__ import annotations
+
+import contextlib
+import ctypes
+import errno
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+import zipfile
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from config import Config, get_state_dir
+
+_CHUNK_SIZE = 1024 * 1024
+_RETRIES = 3
+_USER_AGENT = "cindergrace-argos"
+
+# Replaced packages are kept this long for translations that still use them
+_RETIRED_MAX_AGE = 600
+# Abandoned staging directories (e.g. from a crash) are removed after this long
+_STAGING_MAX_AGE = 3600
+
+# Serializes package directory changes across threads
+install_lock = threading.Lock()
+
+
+class DownloadError(RuntimeError):
+    """Raised when a package could not be downloaded or failed verification."""
+
+
+@dataclass
+class InstallEvent:
+    """Progress of one package through download and install."""
+
+    pkg: object
+    stage: str  # "downloaded", "installed" or "failed"
+    error: str | None = None
+    path: Path | None = None
+
+
+def downloads_dir() -> Path:
+    path = get_state_dir() / "downloads"
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def package_filename(pkg) -> str:
+    code = getattr(pkg, "code", None) or f"translate-{pkg.from_code}_{pkg.to_code}"
+    version = getattr(pkg, "package_version", "") or "0"
+    return f"{code}-{version}.argosmodel".replace("/", "_")
+
+
+def expected_checksum(pkg) -> str | None:
+    """Return the sha256 published in the package index, if there is one."""
+    for attr in ("sha256", "checksum"):
+        value = getattr(pkg, attr, None)
+        if isinstance(value, str) and value:
+            return value.lower().removeprefix("sha256:")
+    return None
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def verify_archive(pkg, path: Path) -> str:
+    """Check the archive's checksum and zip structure; returns its sha256."""
+    checksum = sha256_file(path)
+    expected = expected_checksum(pkg)
+    if expected and checksum != expected:
+        raise DownloadError(f"Checksum mismatch for {path.name}: {checksum} != {expected}")
+    try:
+        with zipfile.ZipFile(path) as archive:
+            broken = archive.testzip()
+    except zipfile.BadZipFile as e:
+        raise DownloadError(f"{path.name} is not a valid package archive") from e
+    if broken is not None:
+        raise DownloadError(f"{path.name} is corrupt ({broken})")
+    return checksum
+
+
+def _fetch(url: str, part: Path) -> None:
+    """Download ``url`` into ``part``, continuing an existing partial file."""
+    offset = part.stat().st_size if part.exists() else 0
+    request = urllib.request.Request(url, headers={"User-Agent": _USER_AGENT})
+    if offset:
+        request.add_header("Range", f"bytes={offset}-")
+    try:
+        response = urllib.request.urlopen(request, timeout=60)  # nosec B310 - index URLs
+    except urllib.error.HTTPError as e:
+        if e.code == 416 and offset:
+            # Nothing left to fetch: the part file is complete (e.g. after a crash
+            # before it was verified); verification decides whether it is usable
+            return
+        raise
+    with response:
+        # 200 means the server ignored the range, so start over
+        mode = "ab" if offset and response.status == 206 else "wb"
+        with part.open(mode) as out:
+            while chunk := response.read(_CHUNK_SIZE):
+                out.write(chunk)
+
+
+def download_package(pkg) -> Path:
+    """Return a verified archive of ``pkg``: from the package store, the mirror or the internet.
+
+    Downloaded archives are added to the store, so each package is only ever
+    downloaded once.
+    """
+    from package_store import package_store
+
+    path = package_store.get(pkg) or package_store.fetch_from_mirror(pkg)
+    if path is not None:
+        return path
+
+    # Archives downloaded before the package store existed
+    legacy = downloads_dir() / package_filename(pkg)
+    if legacy.exists():
+        try:
+            verify_archive(pkg, legacy)
+            return package_store.add(legacy, move=True)
+        except (DownloadError, OSError):
+            legacy.unlink(missing_ok=True)
+
+    if Config.OFFLINE:
+        raise DownloadError(
+            f"{package_filename(pkg)} is not in the package store and offline mode is enabled"
+        )
+    links = list(getattr(pkg, "links", []) or [])
+    if not links:
+        raise DownloadError(f"No download link for {package_filename(pkg)}")
+    part = downloads_dir() / (package_filename(pkg) + ".part")
+    last_error: Exception | None = None
+    for attempt in range(_RETRIES):
+        url = links[attempt % len(links)]
+        try:
+            _fetch(url, part)
+            checksum = verify_archive(pkg, part)
+            return package_store.add(part, digest=checksum, move=True)
+        except DownloadError as e:
+            # A corrupt partial file cannot be resumed
+            part.unlink(missing_ok=True)
+            last_error = e
+        except urllib.error.HTTPError as e:
+            # The server refused the request, so the partial file cannot be trusted to resume
+            part.unlink(missing_ok=True)
+            last_error = e
+            time.sleep(min(2**attempt, 10))
+        except OSError as e:
+            last_error = e
+            time.sleep(min(2**attempt, 10))
+    raise DownloadError(f"Download of {package_filename(pkg)} failed: {last_error}")
+
+
+def _package_data_dir() -> Path:
+    from argostranslate import settings
+
+    return Path(settings.package_data_dir)
+
+
+def staging_dir() -> Path:
+    """Scratch space beside the package directory, so moving a package in is a rename."""
+    packages = _package_data_dir()
+    return packages.with_name(packages.name + ".staging")
+
+
+def retired_dir() -> Path:
+    """Replaced and uninstalled packages wait here until no translation uses them."""
+    packages = _package_data_dir()
+    return packages.with_name(packages.name + ".retired")
+
+
+@contextlib.contextmanager
+def _package_lock() -> Iterator[None]:
+    """argostranslate's own lock around package scans, if it has one."""
+    import argostranslate.package
+
+    lock = getattr(argostranslate.package, "package_lock", None)
+    with lock if lock is not None else contextlib.nullcontext():
+        yield
+
+
+def _exchange(a: Path, b: Path) -> bool:
+    """Atomically swap two directories (Linux renameat2); False where unsupported."""
+    if not sys.platform.startswith("linux"):
+        return False
+    try:
+        renameat2 = ctypes.CDLL(None, use_errno=True).renameat2
+    except (OSError, AttributeError):
+        return False
+    at_fdcwd, rename_exchange = -100, 2
+    if renameat2(at_fdcwd, os.fsencode(a), at_fdcwd, os.fsencode(b), rename_exchange) == 0:
+        return True
+    error = ctypes.get_errno()
+    if error in (errno.EINVAL, errno.ENOSYS, errno.EXDEV, errno.EPERM):
+        return False
+    raise OSError(error, os.strerror(error), str(a))
+
+
+def stage_archive(path: Path) -> Path:
+    """Extract a verified archive into the staging area; returns the package directory."""
+    root = staging_dir() / f"{path.stem}-{uuid.uuid4().hex[:8]}"
+    root.mkdir(parents=True)
+    try:
+        with zipfile.ZipFile(path) as archive:
+            tops = {name.split("/", 1)[0] for name in archive.namelist() if name.strip("/")}
+            if len(tops) != 1:
+                raise DownloadError(f"{path.name} must contain exactly one package directory")
+            archive.extractall(root)
+        package = root / tops.pop()
+        if not (package / "metadata.json").is_file():
+            raise DownloadError(f"{path.name} has no metadata.json")
+    except BaseException:
+        shutil.rmtree(root, ignore_errors=True)
+        raise
+    return package
+
+
+def _retire(path: Path) -> Path:
+    # Caller holds the package lock; a rename within the same file system
+    retired = retired_dir() / f"{path.name}-{int(time.time())}-{uuid.uuid4().hex[:8]}"
+    retired.parent.mkdir(parents=True, exist_ok=True)
+    path.rename(retired)
+    # A rename keeps the old mtime, which purge_retired() would take as the retire time
+    os.utime(retired)
+    return retired
+
+
+def apply_staged(package: Path) -> Path:
+    """Move a staged package into the package directory; returns its installed path.
+
+    A previous version of the package is swapped out in the same step and
+    retired, not deleted.
+    """
+    target = _package_data_dir() / package.name
+    with _package_lock():
+        if not target.exists():
+            package.rename(target)
+        elif _exchange(package, target):
+            # The staged path now holds the old version
+            _retire(package)
+        else:
+            _retire(target)
+            package.rename(target)
+    shutil.rmtree(package.parent, ignore_errors=True)
+    return target
+
+
+def retire_package(package_path: Path) -> Path:
+    """Uninstall by moving the package out of the package directory in one rename."""
+    with install_lock, _package_lock():
+        return _retire(Path(package_path))
+
+
+def purge_retired(max_age: float = _RETIRED_MAX_AGE) -> None:
+    """Delete retired packages older than ``max_age`` and abandoned staging directories."""
+    now = time.time()
+    for directory, age in ((retired_dir(), max_age), (staging_dir(), _STAGING_MAX_AGE)):
+        if not directory.is_dir():
+            continue
+        for entry in directory.iterdir():
+            try:
+                if now - entry.stat().st_mtime >= age:
+                    shutil.rmtree(entry, ignore_errors=True)
+            except OSError:
+                continue
+
+
+def _download_and_stage(pkg) -> tuple[Path, Path | None]:
+    path = download_package(pkg)
+    try:
+        return path, stage_archive(path)
+    except OSError as e:
+        # e.g. no write access beside the package directory
+        print(f"[download] Staging {path.name} failed, installing in place: {e}", file=sys.stderr)
+        return path, None
+
+
+def install_packages(pkgs: Iterable, max_workers: int | None = None) -> Iterator[InstallEvent]:
+    """Download and stage packages concurrently, installing each one as soon as it is ready.
+
+    Yields an event when a package has been downloaded and when it has been
+    installed (or failed), in completion order. An "installed" package is
+    already visible to new package scans. In offline mode only packages the
+    package store or a directory mirror holds can be installed.
+    """
+    pkgs = list(pkgs)
+    if not pkgs:
+        return
+    import argostranslate.package
+
+    purge_retired()
+    workers = max(1, min(max_workers or Config.DOWNLOAD_WORKERS, len(pkgs)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="argos-download") as pool:
+        futures = {pool.submit(_download_and_stage, pkg): pkg for pkg in pkgs}
+        for future in as_completed(futures):
+            pkg = futures[future]
+            try:
+                path, staged = future.result()
+            except Exception as e:
+                print(f"[download] {e}", file=sys.stderr)
+                yield InstallEvent(pkg, "failed", error=str(e))
+                continue
+            yield InstallEvent(pkg, "downloaded", path=path)
+            try:
+                with install_lock:
+                    if staged is not None:
+                        apply_staged(staged)
+                    else:
+                        argostranslate.package.install_from_path(path)
+            except Exception as e:
+                print(f"[download] Installing {path.name} failed: {e}", file=sys.stderr)
+                yield InstallEvent(pkg, "failed", error=str(e), path=path)
+                continue
+            yield InstallEvent(pkg, "installed", path=path)
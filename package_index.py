@@ -0,0 +1,120 @@
+"""Cached view of the Argos package index.
+
+argostranslate keeps the downloaded index as a JSON file in its data
+directory. Instead of fetching it on every status check, the local copy is
+reused until it is older than ARGOS_INDEX_TTL_HOURS and then refreshed in a
+background thread. With ARGOS_PACKAGE_MIRROR set, the index is fetched from
+the mirror instead of the internet. With ARGOS_OFFLINE=1 the network is never
+touched and only the local copy (if any) or a directory mirror is used.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+from config import Config
+
+
+class PackageIndex:
+    """In-memory copy of the available packages, backed by argostranslate's index file."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._packages: list | None = None
+        self._loaded_mtime: float | None = None
+        self._refresh_thread: threading.Thread | None = None
+        self.last_error: str | None = None
+
+    @property
+    def index_path(self) -> Path:
+        import argostranslate.settings
+
+        return Path(argostranslate.settings.local_package_index)
+
+    def _mtime(self) -> float | None:
+        try:
+            return self.index_path.stat().st_mtime
+        except OSError:
+            return None
+
+    def age_seconds(self) -> float | None:
+        """Age of the local index copy, or None if there is none."""
+        mtime = self._mtime()
+        return None if mtime is None else max(0.0, time.time() - mtime)
+
+    def is_stale(self) -> bool:
+        age = self.age_seconds()
+        return age is None or age > Config.PACKAGE_INDEX_TTL_HOURS * 3600
+
+    def can_refresh(self) -> bool:
+        """Offline, the index can still be refreshed from a directory mirror."""
+        from package_store import package_store
+
+        return not Config.OFFLINE or package_store.mirror_is_local
+
+    def refresh(self) -> bool:
+        """Download a fresh index now; returns False when offline or on failure."""
+        if not self.can_refresh():
+            return False
+        import argostranslate.package
+        import argostranslate.settings
+
+        from package_store import package_store
+
+        with self._refresh_lock:
+            try:
+                mirror_index = package_store.mirror_index_url()
+                if mirror_index is not None:
+                    argostranslate.settings.remote_package_index = mirror_index
+                argostranslate.package.update_package_index()
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"[index] Package index refresh failed: {e}", file=sys.stderr)
+                return False
+            self.last_error = None
+        with self._lock:
+            self._packages = None
+        return True
+
+    def refresh_in_background(self) -> None:
+        """Start a background refresh if the local copy is stale and none is running."""
+        if not self.can_refresh() or not self.is_stale():
+            return
+        with self._lock:
+            if self._refresh_thread is not None and self._refresh_thread.is_alive():
+                return
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, name="argos-index-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+
+    def available_packages(self) -> list:
+        """Return the packages from the local index copy without blocking on the network.
+
+        A stale copy is served as-is while a background refresh runs; with no
+        local copy at all the list is empty until the first refresh finishes.
+        """
+        self.refresh_in_background()
+        mtime = self._mtime()
+        with self._lock:
+            if self._packages is not None and mtime == self._loaded_mtime:
+                return list(self._packages)
+        if mtime is None:
+            return []
+        import argostranslate.package
+
+        try:
+            packages = argostranslate.package.get_available_packages()
+        except Exception as e:
+            print(f"[index] Reading package index failed: {e}", file=sys.stderr)
+            return []
+        with self._lock:
+            self._packages = packages
+            self._loaded_mtime = mtime
+        return list(packages)
+
+
+package_index = PackageIndex()
@@ -0,0 +1,309 @@
+"""Content-addressed store of package archives, with an optional mirror.
+
+Every downloaded ``.argosmodel`` is kept under its sha256
+(``sha256/ab/abcd....argosmodel``) in ``ARGOS_PACKAGE_STORE`` (default: the
+``package-store`` directory in the state directory), so reinstalls never
+download again. ``index.json`` next to the archives lists their metadata in
+the format of the Argos package index, with a ``sha256`` field and links
+relative to the store. A store can be shared between hosts by pointing
+``ARGOS_PACKAGE_STORE`` at a shared directory, or served read-only over HTTP
+(any static file server) and used through ``ARGOS_PACKAGE_MIRROR``, which
+also accepts a directory. With a mirror, the package list comes from the
+mirror's index instead of the internet. Updates of ``index.json`` are
+serialized across processes and hosts with ``flock`` on ``.index.lock``
+(the store's file system must support it, as local disks and NFS do).
+"""
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import uuid
+import zipfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import Config, get_state_dir
+from package_downloads import DownloadError, _fetch, expected_checksum, sha256_file, verify_archive
+
+try:
+    import fcntl
+except ImportError:  # Windows: only threads of this process are serialized
+    fcntl = None
+
+INDEX_NAME = "index.json"
+LOCK_NAME = ".index.lock"
+
+
+def package_key(metadata) -> tuple[str, str, str]:
+    """Identify a package by pair and version, for objects and metadata dicts alike."""
+    get = metadata.get if isinstance(metadata, dict) else lambda key: getattr(metadata, key, None)
+    return (get("from_code") or "", get("to_code") or "", str(get("package_version") or ""))
+
+
+def read_metadata(path: Path) -> dict:
+    """Return the ``metadata.json`` of a package archive."""
+    try:
+        with zipfile.ZipFile(path) as archive:
+            for name in archive.namelist():
+                if name.count("/") == 1 and name.endswith("/metadata.json"):
+                    return json.loads(archive.read(name))
+    except (zipfile.BadZipFile, ValueError) as e:
+        raise DownloadError(f"{path.name} is not a valid package archive") from e
+    raise DownloadError(f"{path.name} has no metadata.json")
+
+
+def _is_url(location: str) -> bool:
+    return "://" in location
+
+
+class PackageStore:
+    """Archives by sha256 in ``root``, falling back to a read-only mirror."""
+
+    def __init__(self, root: Path, mirror: str | None = None):
+        self.root = root
+        self.mirror = mirror or None
+        self._lock = threading.Lock()
+        self._index: dict[tuple[str, str, str], dict] | None = None
+        self._index_mtime: float | None = None
+        self._mirror_index: dict[tuple[str, str, str], dict] | None = None
+        self._mirror_loaded = 0.0
+
+    @classmethod
+    def from_config(cls) -> PackageStore:
+        root = Path(Config.PACKAGE_STORE) if Config.PACKAGE_STORE else get_state_dir() / "package-store"
+        return cls(root.expanduser(), Config.PACKAGE_MIRROR)
+
+    @staticmethod
+    def relative_path(digest: str) -> str:
+        return f"sha256/{digest[:2]}/{digest}.argosmodel"
+
+    def blob_path(self, digest: str) -> Path:
+        return self.root / self.relative_path(digest)
+
+    @property
+    def mirror_is_local(self) -> bool:
+        """A directory mirror needs no network, so it is used in offline mode too."""
+        return self.mirror is not None and not _is_url(self.mirror)
+
+    def mirror_index_url(self) -> str | None:
+        if self.mirror is None:
+            return None
+        if self.mirror_is_local:
+            return (Path(self.mirror).expanduser().resolve() / INDEX_NAME).as_uri()
+        return urllib.parse.urljoin(self.mirror.rstrip("/") + "/", INDEX_NAME)
+
+    # --- Index ---
+
+    @contextmanager
+    def _index_lock(self) -> Iterator[None]:
+        """Hold the index for a read-modify-write, against other processes and hosts too."""
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            with open(self.root / LOCK_NAME, "a+b") as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _read_index(self, path: Path) -> dict[tuple[str, str, str], dict]:
+        entries = json.loads(path.read_text(encoding="utf-8"))
+        return {package_key(entry): entry for entry in entries if entry.get("sha256")}
+
+    def index(self) -> dict[tuple[str, str, str], dict]:
+        """Entries of the local store, re-read when another host changed the file."""
+        path = self.root / INDEX_NAME
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            return {}
+        with self._lock:
+            if self._index is None or mtime != self._index_mtime:
+                try:
+                    self._index = self._read_index(path)
+                except (OSError, ValueError) as e:
+                    print(f"[store] Reading {path} failed: {e}", file=sys.stderr)
+                    self._index = {}
+                self._index_mtime = mtime
+            return dict(self._index)
+
+    def mirror_index(self) -> dict[tuple[str, str, str], dict]:
+        """Entries of the mirror's index, fetched at most once per ARGOS_INDEX_TTL_HOURS."""
+        url = self.mirror_index_url()
+        if url is None or (Config.OFFLINE and not self.mirror_is_local):
+            return {}
+        max_age = Config.PACKAGE_INDEX_TTL_HOURS * 3600
+        with self._lock:
+            if self._mirror_index is not None and time.time() - self._mirror_loaded < max_age:
+                return dict(self._mirror_index)
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:  # nosec B310 - configured
+                entries = json.loads(response.read())
+            index = {package_key(entry): entry for entry in entries if entry.get("sha256")}
+        except (OSError, ValueError) as e:
+            print(f"[store] Reading mirror index {url} failed: {e}", file=sys.stderr)
+            index = {}
+        with self._lock:
+            self._mirror_index, self._mirror_loaded = index, time.time()
+        return dict(index)
+
+    def write_index(self, base_url: str | None = None) -> int:
+        """Rebuild ``index.json`` from the archives in the store; returns the entry count.
+
+        Links are relative to the store unless ``base_url`` is given.
+        """
+        entries = []
+        # Locked throughout so an archive added meanwhile is not dropped from the index
+        with self._index_lock():
+            for blob in sorted((self.root / "sha256").glob("*/*.argosmodel")):
+                digest = blob.stem
+                try:
+                    metadata = read_metadata(blob)
+                except (OSError, DownloadError) as e:
+                    print(f"[store] Skipping {blob.name}: {e}", file=sys.stderr)
+                    continue
+                link = self.relative_path(digest)
+                if base_url:
+                    link = urllib.parse.urljoin(base_url.rstrip("/") + "/", link)
+                entries.append(
+                    {**metadata, "sha256": digest, "size": blob.stat().st_size, "links": [link]}
+                )
+            self._write_index_file(entries)
+        return len(entries)
+
+    def _write_index_file(self, entries: list[dict]) -> None:
+        # Caller holds _index_lock(); replaced atomically so readers never see a partial file
+        tmp = self.root / f".{INDEX_NAME}.{uuid.uuid4().hex[:8]}"
+        tmp.write_text(json.dumps(entries, indent=1, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.root / INDEX_NAME)
+        self._index = None
+
+    # --- Archives ---
+
+    def digest_for(self, pkg) -> str | None:
+        """The sha256 of a package from the package index, the store or the mirror."""
+        digest = expected_checksum(pkg)
+        if digest:
+            return digest
+        key = package_key(pkg)
+        for index in (self.index(), self.mirror_index()):
+            entry = index.get(key)
+            if entry is not None:
+                return entry["sha256"]
+        return None
+
+    def get(self, pkg) -> Path | None:
+        """Return the stored, verified archive of ``pkg`` if the store has it."""
+        digest = self.digest_for(pkg)
+        if digest is None:
+            return None
+        path = self.blob_path(digest)
+        if not path.is_file():
+            return None
+        try:
+            if verify_archive(pkg, path) == digest:
+                return path
+        except DownloadError as e:
+            print(f"[store] {e}", file=sys.stderr)
+        print(f"[store] Removing corrupt {path.name}", file=sys.stderr)
+        path.unlink(missing_ok=True)
+        return None
+
+    def available_offline(self, pkg) -> bool:
+        """True if ``pkg`` can be installed without the network."""
+        digest = self.digest_for(pkg)
+        if digest is None:
+            return False
+        if self.blob_path(digest).is_file():
+            return True
+        return self.mirror_is_local and (
+            Path(self.mirror).expanduser() / self.relative_path(digest)
+        ).is_file()
+
+    def fetch_from_mirror(self, pkg) -> Path | None:
+        """Copy ``pkg`` from the mirror into the store; None if the mirror lacks it."""
+        if self.mirror is None or (Config.OFFLINE and not self.mirror_is_local):
+            return None
+        entry = self.mirror_index().get(package_key(pkg))
+        digest = expected_checksum(pkg) or (entry or {}).get("sha256")
+        if digest is None:
+            return None
+        relative = self.relative_path(digest)
+        if self.mirror_is_local:
+            source = Path(self.mirror).expanduser() / relative
+            if not source.is_file():
+                return None
+            return self._add_from_mirror(source, digest, move=False)
+
+        links = (entry or {}).get("links") or [relative]
+        url = urllib.parse.urljoin(self.mirror.rstrip("/") + "/", links[0])
+        self.root.mkdir(parents=True, exist_ok=True)
+        part = self.root / f".{digest}.part"
+        try:
+            _fetch(url, part)
+        except urllib.error.HTTPError as e:
+            part.unlink(missing_ok=True)
+            print(f"[store] Mirror download {url} failed: {e}", file=sys.stderr)
+            return None
+        except OSError as e:
+            print(f"[store] Mirror download {url} failed: {e}", file=sys.stderr)
+            return None
+        return self._add_from_mirror(part, digest, move=True)
+
+    def _add_from_mirror(self, path: Path, digest: str, move: bool) -> Path | None:
+        # A corrupt mirror archive must not fail the install; the caller downloads instead
+        try:
+            return self.add(path, digest=digest, move=move)
+        except (DownloadError, OSError) as e:
+            if move:
+                path.unlink(missing_ok=True)
+            print(f"[store] Ignoring mirror archive: {e}", file=sys.stderr)
+            return None
+
+    def add(self, path: Path, digest: str | None = None, move: bool = False) -> Path:
+        """Put an archive into the store under its sha256 and record it in the index."""
+        actual = sha256_file(path)
+        if digest is not None and actual != digest:
+            if move:
+                path.unlink(missing_ok=True)
+            raise DownloadError(f"Checksum mismatch for {path.name}: {actual} != {digest}")
+        metadata = read_metadata(path)
+        target = self.blob_path(actual)
+        if not target.is_file():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}")
+            if move:
+                shutil.move(str(path), tmp)
+            else:
+                shutil.copyfile(path, tmp)
+            os.replace(tmp, target)
+        elif move:
+            path.unlink(missing_ok=True)
+        entry = {
+            **metadata,
+            "sha256": actual,
+            "size": target.stat().st_size,
+            "links": [self.relative_path(actual)],
+        }
+        with self._index_lock():
+            path_index = self.root / INDEX_NAME
+            try:
+                entries = self._read_index(path_index) if path_index.exists() else {}
+            except (OSError, ValueError):
+                entries = {}
+            entries[package_key(entry)] = entry
+            self._write_index_file(list(entries.values()))
+        return target
+
+
+package_store = PackageStore.from_config()
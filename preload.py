@@ -0,0 +1,127 @@
+"""Background preloading and warmup of language pairs at startup.
+
+``ARGOS_PRELOAD`` lists the pairs to load (``en:de,de:en``) or ``all`` for every
+installed package. Each pair's models are loaded and run once on a short
+warmup text (in every worker process when ARGOS_WORKERS is set), so the
+first real request does not pay for the model load or a cold CTranslate2
+run. Readiness is reported once the first preload pass has finished, for
+load balancers that should hold traffic until then.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+import time
+
+from config import Config
+from engine import NoPackageError, translate_uncached, translator_registry
+from worker_pool import get_worker_pool
+
+WARMUP_TEXT = "Hello, world. This short sentence warms up the translation model."
+
+
+def parse_preload(
+    spec: str, installed_pairs: list[tuple[str, str]], errors: dict[str, str] | None = None
+) -> list[tuple[str, str]]:
+    """Expand an ARGOS_PRELOAD value into the package pairs that have to be loaded.
+
+    Pivoted pairs expand to the packages along their route. Invalid or
+    unreachable entries are skipped and recorded in ``errors``.
+    """
+    spec = spec.strip()
+    if spec.lower() == "all":
+        return list(installed_pairs)
+    pairs: list[tuple[str, str]] = []
+    for item in spec.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        from_code, sep, to_code = (part.strip() for part in item.partition(":"))
+        try:
+            if not sep or not from_code or not to_code:
+                raise ValueError(f"Invalid ARGOS_PRELOAD entry '{item}', expected from:to")
+            hops = translator_registry.route(from_code, to_code).hops
+        except (ValueError, NoPackageError) as e:
+            print(f"[preload] {e}", file=sys.stderr)
+            if errors is not None:
+                errors[item] = str(e)
+            continue
+        pairs.extend(hop for hop in hops if hop not in pairs)
+    return pairs
+
+
+class Preloader:
+    """Loads and warms configured pairs in a background thread."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.ready = False
+        self.running = False
+        self.loaded: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+
+    def start(self) -> None:
+        """Start a preload pass unless one is running; without pairs the process is ready."""
+        if not Config.PRELOAD:
+            self.ready = True
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self.running = True
+            self._thread = threading.Thread(target=self._run, name="argos-preload", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        start = time.perf_counter()
+        self.loaded, self.errors = {}, {}
+        pairs: list[tuple[str, str]] = []
+        try:
+            pairs = parse_preload(
+                Config.PRELOAD, translator_registry.installed_pairs(), self.errors
+            )
+            pool = get_worker_pool()
+            for from_code, to_code in pairs:
+                name = f"{from_code}->{to_code}"
+                pair_start = time.perf_counter()
+                try:
+                    # Bypasses the result cache, so the model really runs once
+                    if pool is not None:
+                        # Every worker, since any of them may get the pair's first request
+                        pool.warm(WARMUP_TEXT, from_code, to_code)
+                    else:
+                        translate_uncached(WARMUP_TEXT, from_code, to_code)
+                except Exception as e:
+                    self.errors[name] = str(e)
+                    print(f"[preload] {name} failed: {e}", file=sys.stderr)
+                    continue
+                self.loaded[name] = round(time.perf_counter() - pair_start, 3)
+                print(f"[preload] {name} ready in {self.loaded[name]:.2f}s", file=sys.stderr)
+        finally:
+            self.running = False
+            # Failed pairs do not block readiness; they are reported in status()
+            self.ready = True
+        print(
+            f"[preload] {len(self.loaded)} of {len(pairs)} pairs ready "
+            f"in {time.perf_counter() - start:.2f}s",
+            file=sys.stderr,
+        )
+
+    def wait(self, timeout: float | None = None) -> bool:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+        return self.ready
+
+    def status(self) -> dict:
+        """Readiness payload for health checks."""
+        return {
+            "status": "ready" if self.ready else "loading",
+            "preloading": self.running,
+            "loaded": dict(self.loaded),
+            "errors": dict(self.errors),
+        }
+
+
+preloader = Preloader()
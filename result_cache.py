@@ -0,0 +1,261 @@
+"""Two-tier cache for finished translations.
+
+Entries are keyed by (source code, target code, package version, hash of the
+NFC-normalized text). Whitespace is part of the key, since the cached
+translation keeps the layout of the text it was made from. The memory tier is
+a plain LRU; the disk tier is a SQLite file in the XDG state directory, trimmed
+by least recent access once it grows past its size limit.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from config import Config, get_state_dir
+
+_HORIZONTAL_WS = re.compile(r"[ \t\f\v]+")
+
+
+def normalize_text(text: str) -> str:
+    """Normalize Unicode and whitespace so trivially different sentences compare equal."""
+    text = unicodedata.normalize("NFC", text)
+    lines = [_HORIZONTAL_WS.sub(" ", line).strip() for line in text.splitlines()]
+    return "\n".join(lines).strip()
+
+
+def make_key(from_code: str, to_code: str, version: str, text: str) -> tuple[str, str, str, str]:
+    # "v2": earlier keys hashed whitespace-normalized text and must not match
+    # (their values carry another input's layout)
+    data = "v2\0" + unicodedata.normalize("NFC", text)
+    digest = hashlib.sha256(data.encode("utf-8")).hexdigest()
+    return from_code, to_code, version or "", digest
+
+
+class MemoryLRU:
+    """Thread-safe LRU mapping bounded by entry count."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def drop_pair(self, from_code: str, to_code: str) -> None:
+        with self._lock:
+            for key in [k for k in self._data if k[0] == from_code and k[1] == to_code]:
+                del self._data[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache:
+    """SQLite-backed cache tier bounded by total stored bytes."""
+
+    def __init__(self, path: Path, max_bytes: int):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS translations (
+                    from_code TEXT NOT NULL,
+                    to_code TEXT NOT NULL,
+                    version TEXT NOT NULL,
+                    digest TEXT NOT NULL,
+                    result TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (from_code, to_code, version, digest)
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations(accessed)"
+            )
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()
+            self._total_bytes = row[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, key) -> str | None:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute(
+                "SELECT result FROM translations "
+                "WHERE from_code=? AND to_code=? AND version=? AND digest=?",
+                key,
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE translations SET accessed=? "
+                "WHERE from_code=? AND to_code=? AND version=? AND digest=?",
+                (time.time(), *key),
+            )
+            conn.commit()
+            return row[0]
+
+    def put(self, key, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = self._connect()
+            old = conn.execute(
+                "SELECT size FROM translations "
+                "WHERE from_code=? AND to_code=? AND version=? AND digest=?",
+                key,
+            ).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, value, size, time.time()),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        # Trim to 90% of the budget so eviction does not run on every insert
+        target = int(self.max_bytes * 0.9)
+        rows = conn.execute(
+            "SELECT rowid, size FROM translations ORDER BY accessed ASC"
+        ).fetchall()
+        doomed = []
+        for rowid, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((rowid,))
+            self._total_bytes -= size
+        conn.executemany("DELETE FROM translations WHERE rowid=?", doomed)
+
+    def drop_pair(self, from_code: str, to_code: str) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute(
+                "DELETE FROM translations WHERE from_code=? AND to_code=?", (from_code, to_code)
+            )
+            conn.commit()
+            row = conn.execute("SELECT COALESCE(SUM(size), 0) FROM translations").fetchone()
+            self._total_bytes = row[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM translations")
+            conn.commit()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+class ResultCache:
+    """Memory LRU in front of an optional SQLite tier."""
+
+    def __init__(self, memory_entries: int, disk_path: Path | None, disk_max_bytes: int):
+        self.memory = MemoryLRU(memory_entries)
+        self.disk = None
+        if disk_path is not None and disk_max_bytes > 0:
+            self.disk = DiskCache(disk_path, disk_max_bytes)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls) -> ResultCache | None:
+        """Build the cache from ``Config``; returns None when caching is disabled."""
+        if not Config.CACHE_ENABLED:
+            return None
+        return cls(
+            memory_entries=Config.CACHE_MEMORY_ENTRIES,
+            disk_path=get_state_dir() / "translation_cache.sqlite3",
+            disk_max_bytes=Config.CACHE_DISK_MB * 1024 * 1024,
+        )
+
+    def get(self, from_code: str, to_code: str, version: str, text: str) -> str | None:
+        key = make_key(from_code, to_code, version, text)
+        value = self.memory.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+        if self.disk is not None:
+            try:
+                value = self.disk.get(key)
+            except sqlite3.Error as e:
+                print(f"[cache] Disk cache read failed: {e}", file=sys.stderr)
+                value = None
+            if value is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                self.memory.put(key, value)
+                return value
+        self.misses += 1
+        return None
+
+    def put(self, from_code: str, to_code: str, version: str, text: str, result: str) -> None:
+        key = make_key(from_code, to_code, version, text)
+        self.memory.put(key, result)
+        if self.disk is not None:
+            try:
+                self.disk.put(key, result)
+            except sqlite3.Error as e:
+                print(f"[cache] Disk cache write failed: {e}", file=sys.stderr)
+
+    def drop_pair(self, from_code: str, to_code: str) -> None:
+        """Forget every entry for a pair, e.g. after its package was reinstalled."""
+        self.memory.drop_pair(from_code, to_code)
+        if self.disk is not None:
+            try:
+                self.disk.drop_pair(from_code, to_code)
+            except sqlite3.Error as e:
+                print(f"[cache] Disk cache purge failed: {e}", file=sys.stderr)
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "memory_entries": len(self.memory),
+            "disk_bytes": self.disk.total_bytes if self.disk is not None else 0,
+        }
+
+
+result_cache = ResultCache.from_config()
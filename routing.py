@@ -0,0 +1,88 @@
+"""Routing table over the installed language packages.
+
+Every installed package is an edge from its source to its target language.
+The table holds the cheapest route for every reachable pair, so a pair
+without a direct package can still be translated through a pivot language
+(usually English). It is built once per package set and only rebuilt after
+packages are installed or removed.
+"""
+from __future__ import annotations
+
+import heapq
+from collections.abc import Iterable
+from dataclasses import dataclass
+from itertools import pairwise
+
+
+@dataclass(frozen=True)
+class Route:
+    """Sequence of installed (from_code, to_code) packages leading to a target."""
+
+    hops: tuple[tuple[str, str], ...]
+
+    @property
+    def codes(self) -> list[str]:
+        return [self.hops[0][0], *(to_code for _from, to_code in self.hops)]
+
+    @property
+    def pivoted(self) -> bool:
+        return len(self.hops) > 1
+
+    def __str__(self) -> str:
+        return " -> ".join(self.codes)
+
+
+class RouteTable:
+    """Cheapest routes between all installed languages.
+
+    A route costs one per hop; among routes with the same number of hops the
+    one pivoting through ``preferred_pivot`` wins, since most packages are
+    trained to and from English.
+    """
+
+    def __init__(
+        self, pairs: Iterable[tuple[str, str]], max_hops: int = 2, preferred_pivot: str = "en"
+    ):
+        self.max_hops = max(1, max_hops)
+        self.preferred_pivot = preferred_pivot
+        self._edges: dict[str, list[str]] = {}
+        for from_code, to_code in pairs:
+            if from_code != to_code:
+                self._edges.setdefault(from_code, []).append(to_code)
+        self._routes: dict[tuple[str, str], Route] = {}
+        for source in list(self._edges):
+            self._routes.update(self._search(source))
+
+    def _search(self, source: str) -> dict[tuple[str, str], Route]:
+        # Dijkstra on (hops, pivots other than the preferred one, path)
+        best: dict[str, tuple[int, int]] = {source: (0, 0)}
+        routes: dict[tuple[str, str], Route] = {}
+        queue: list[tuple[int, int, tuple[str, ...]]] = [(0, 0, (source,))]
+        while queue:
+            hops, detours, path = heapq.heappop(queue)
+            node = path[-1]
+            if best.get(node, (hops, detours)) < (hops, detours):
+                continue
+            if node != source:
+                routes[(source, node)] = Route(tuple(pairwise(path)))
+            if hops >= self.max_hops:
+                continue
+            for target in self._edges.get(node, ()):
+                if target in path:
+                    continue
+                cost = (hops + 1, detours + (node not in (source, self.preferred_pivot)))
+                if cost < best.get(target, (self.max_hops + 1, 0)):
+                    best[target] = cost
+                    heapq.heappush(queue, (*cost, (*path, target)))
+        return routes
+
+    def route(self, from_code: str, to_code: str) -> Route | None:
+        """Return the cheapest route for a pair, or None if it is unreachable."""
+        return self._routes.get((from_code, to_code))
+
+    def targets(self, from_code: str) -> list[str]:
+        """Return every language reachable from ``from_code``."""
+        return sorted(to_code for source, to_code in self._routes if source == from_code)
+
+    def __len__(self) -> int:
+        return len(self._routes)
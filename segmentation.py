@@ -0,0 +1,159 @@
+"""Split text into paragraphs and sentences without losing its layout.
+
+``segment_text`` turns a document into a flat list of segments. Sentence
+segments are sent to the model; everything else (blank lines, indentation,
+the spaces between sentences) is kept verbatim so ``join_segments`` can put
+the translated document back together with the original whitespace.
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+
+# Paragraph breaks: a newline followed by optional whitespace and another newline
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t\f\v\r]*\n\s*")
+# Line breaks inside a paragraph (lists, addresses, verse) are kept as-is
+_LINE_BREAK = re.compile(r"[ \t\f\v\r]*\n[ \t\f\v\r]*")
+# Candidate sentence boundaries: terminal punctuation, optional closing quotes, whitespace
+_SENTENCE_END = re.compile(r"(?<=[.!?…。！？])[\"'”’)\]]*\s+")
+_CJK_SENTENCE_END = re.compile(r"(?<=[。！？])")
+# Do not split after single initials or common abbreviations ("Dr. Smith", "e.g. this")
+_ABBREVIATION = re.compile(
+    r"(?:\b[A-Za-z]|\b(?:Mr|Mrs|Ms|Dr|Prof|St|vs|etc|e\.g|i\.e|z\.B|bzw|ca|Nr|usw|vgl))\.$"
+)
+
+
+@dataclass
+class Segment:
+    """A piece of the source document.
+
+    Attributes:
+        text: The original text of the piece.
+        translatable: True for sentences, False for whitespace kept verbatim.
+        paragraph: Index of the paragraph the piece belongs to.
+    """
+
+    text: str
+    translatable: bool
+    paragraph: int
+
+
+def split_sentences(text: str) -> list[str]:
+    """Split one line of text into sentences, keeping inter-sentence whitespace.
+
+    Returns alternating sentence and whitespace pieces that concatenate back to
+    ``text``; even indices are sentences.
+    """
+    pieces: list[str] = []
+    last = 0
+    for match in _SENTENCE_END.finditer(text):
+        candidate = text[last:match.start()]
+        if _ABBREVIATION.search(candidate.rstrip("\"'”’)]")):
+            continue
+        end_of_sentence = match.start() + len(match.group(0).rstrip())
+        pieces.append(text[last:end_of_sentence])
+        pieces.append(text[end_of_sentence:match.end()])
+        last = match.end()
+    pieces.append(text[last:])
+
+    # CJK full stops are not followed by spaces
+    result: list[str] = []
+    for i, piece in enumerate(pieces):
+        if i % 2:
+            result.append(piece)
+            continue
+        parts = [p for p in _CJK_SENTENCE_END.split(piece) if p]
+        for j, part in enumerate(parts or [piece]):
+            if j:
+                result.append("")
+            result.append(part)
+    return result
+
+
+def segment_text(text: str) -> list[Segment]:
+    """Split ``text`` into sentence and whitespace segments."""
+    segments: list[Segment] = []
+
+    def add(piece: str, translatable: bool, paragraph: int) -> None:
+        if not piece:
+            return
+        if not translatable or not piece.strip():
+            segments.append(Segment(piece, False, paragraph))
+            return
+        # Keep leading/trailing whitespace of the sentence out of the model input
+        stripped = piece.strip()
+        lead = piece[: len(piece) - len(piece.lstrip())]
+        trail = piece[len(piece.rstrip()):]
+        if lead:
+            segments.append(Segment(lead, False, paragraph))
+        segments.append(Segment(stripped, True, paragraph))
+        if trail:
+            segments.append(Segment(trail, False, paragraph))
+
+    paragraph = 0
+    last = 0
+    blocks: list[tuple[str, str]] = []
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        blocks.append((text[last:match.start()], match.group(0)))
+        last = match.end()
+    blocks.append((text[last:], ""))
+
+    for block, separator in blocks:
+        line_last = 0
+        for line_match in _LINE_BREAK.finditer(block):
+            for i, piece in enumerate(split_sentences(block[line_last:line_match.start()])):
+                add(piece, i % 2 == 0, paragraph)
+            add(line_match.group(0), False, paragraph)
+            line_last = line_match.end()
+        for i, piece in enumerate(split_sentences(block[line_last:])):
+            add(piece, i % 2 == 0, paragraph)
+        add(separator, False, paragraph)
+        if block.strip():
+            paragraph += 1
+    return segments
+
+
+def split_paragraphs(text: str) -> list[str]:
+    """Split ``text`` into paragraph chunks that concatenate back to ``text``.
+
+    Each chunk carries its trailing separator, so translating the stripped
+    chunk and restoring its outer whitespace keeps the original layout.
+    """
+    chunks: list[list[str]] = []
+    current = -1
+    for segment in segment_text(text):
+        if segment.paragraph != current:
+            chunks.append([])
+            current = segment.paragraph
+        chunks[-1].append(segment.text)
+    return ["".join(chunk) for chunk in chunks]
+
+
+def join_segments(segments: list[Segment], translations: list[str]) -> str:
+    """Rebuild a document from segments, replacing sentences with ``translations``."""
+    out: list[str] = []
+    it = iter(translations)
+    for segment in segments:
+        out.append(next(it) if segment.translatable else segment.text)
+    return "".join(out)
+
+
+def make_batches(lengths: list[int], max_tokens: int) -> list[list[int]]:
+    """Group item indices into batches of at most ``max_tokens`` tokens.
+
+    Args:
+        lengths: Token count of each item, in document order.
+        max_tokens: Token budget per batch; an oversized item gets a batch of its own.
+    """
+    batches: list[list[int]] = []
+    current: list[int] = []
+    budget = 0
+    for i, cost in enumerate(lengths):
+        if current and budget + cost > max_tokens:
+            batches.append(current)
+            current, budget = [], 0
+        current.append(i)
+        budget += cost
+    if current:
+        batches.append(current)
+    return batches
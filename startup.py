@@ -0,0 +1,79 @@
+"""Startup phase timing, printed to stderr when ARGOS_STARTUP_TIMING=1."""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from config import Config
+
+
+def process_uptime() -> float | None:
+    """Seconds since this process started (Linux only, None elsewhere)."""
+    try:
+        stat = Path("/proc/self/stat").read_text()
+        # Field 22 (starttime) counted after the parenthesized command name
+        start_ticks = int(stat.rsplit(")", 1)[1].split()[19])
+        uptime = float(Path("/proc/uptime").read_text().split()[0])
+        return max(0.0, uptime - start_ticks / os.sysconf("SC_CLK_TCK"))
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class PhaseTimer:
+    """Collects the duration of named startup phases in order."""
+
+    def __init__(self) -> None:
+        self.phases: list[tuple[str, float]] = []
+
+    def record(self, name: str, seconds: float) -> None:
+        self.phases.append((name, seconds))
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def report(self) -> None:
+        """Print the phase table to stderr if ARGOS_STARTUP_TIMING is set."""
+        if not Config.STARTUP_TIMING:
+            return
+        # Phases may nest, so the total is the process age where it is known
+        total = process_uptime()
+        if total is None:
+            total = sum(seconds for _name, seconds in self.phases)
+        width = max((len(name) for name, _seconds in self.phases), default=0)
+        print("[startup] Phase timings:", file=sys.stderr)
+        for name, seconds in self.phases:
+            print(f"[startup]   {name:<{width}}  {seconds * 1000:8.1f} ms", file=sys.stderr)
+        print(f"[startup]   {'total':<{width}}  {total * 1000:8.1f} ms", file=sys.stderr)
+
+
+startup_timer = PhaseTimer()
+
+
+def warm_imports_in_background() -> None:
+    """Import the model runtime after the server is up, so the first request does not pay for it."""
+
+    def warm() -> None:
+        start = time.perf_counter()
+        try:
+            import argostranslate.translate  # noqa: F401
+        except Exception as e:
+            print(f"[startup] Background import failed: {e}", file=sys.stderr)
+            return
+        if Config.STARTUP_TIMING:
+            print(
+                f"[startup] argostranslate.translate imported in background "
+                f"in {(time.perf_counter() - start) * 1000:.1f} ms",
+                file=sys.stderr,
+            )
+
+    threading.Thread(target=warm, name="argos-warm-imports", daemon=True).start()
@@ -0,0 +1,193 @@
+"""Per-request stage timings and on-demand profiling.
+
+A request handler opens a ``RequestTrace`` with ``trace_request()``; code
+along the translation path wraps its work in ``stage(name)``, which adds
+the elapsed time to the active trace and does nothing outside a request.
+Nested stages are named ``parent/child`` (e.g. ``model/decode``) and are
+part of their parent's time; whatever the top-level stages do not cover is
+reported as ``other``.
+
+With ARGOS_TRACE=1 every finished trace is logged to stderr as one JSON
+line. With ARGOS_PROFILE_SLOW_MS set, each traced request also runs under
+cProfile, and profiles of requests at least that slow are written to
+``profiles/`` in the state directory (read them with ``python -m pstats``).
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import sys
+import time
+import uuid
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from config import Config, get_state_dir
+
+# Saved profiles beyond this many are deleted, oldest first
+_PROFILES_KEPT = 50
+
+_current: ContextVar[RequestTrace | None] = ContextVar("argos_trace", default=None)
+
+
+class RequestTrace:
+    """Time spent in each stage of one request."""
+
+    def __init__(self, kind: str, from_code: str = "", to_code: str = "") -> None:
+        self.id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.from_code = from_code
+        self.to_code = to_code
+        self.started = time.time()
+        self.seconds = 0.0
+        self.stages: dict[str, float] = {}
+        self.error: str | None = None
+        self.profile_path: Path | None = None
+        self._profile = cProfile.Profile() if Config.PROFILE_SLOW_MS > 0 else None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    @property
+    def other_seconds(self) -> float:
+        """Time not covered by any top-level stage."""
+        covered = sum(seconds for name, seconds in self.stages.items() if "/" not in name)
+        return max(0.0, self.seconds - covered)
+
+    @contextmanager
+    def active(self) -> Iterator[RequestTrace]:
+        """Make this the current trace (and profile) for the enclosed code.
+
+        A streamed request enters this once per chunk, since its chunks may be
+        produced on different threads.
+        """
+        token = _current.set(self)
+        profiling = False
+        if self._profile is not None:
+            try:
+                self._profile.enable()
+                profiling = True
+            except ValueError:
+                # Another profiler is active on this thread
+                self._profile = None
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.seconds += time.perf_counter() - start
+            if profiling:
+                self._profile.disable()
+            _current.reset(token)
+
+    def finish(self) -> None:
+        """Keep the profile if the request was slow, log the trace and remember it."""
+        if self._profile is not None and self.seconds * 1000 >= Config.PROFILE_SLOW_MS:
+            self.profile_path = _save_profile(self, self._profile)
+        self._profile = None
+        recent_traces.append(self)
+        if Config.TRACE_ENABLED:
+            print(f"[trace] {json.dumps(self.as_dict())}", file=sys.stderr)
+        if self.profile_path is not None:
+            print(
+                f"[trace] {self.kind} {self.id} took {self.seconds * 1000:.0f} ms, "
+                f"profile saved to {self.profile_path}",
+                file=sys.stderr,
+            )
+
+    def as_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "pair": f"{self.from_code}->{self.to_code}",
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+            "ms": round(self.seconds * 1000, 2),
+            "stages_ms": {
+                **{name: round(seconds * 1000, 2) for name, seconds in self.stages.items()},
+                "other": round(self.other_seconds * 1000, 2),
+            },
+            "error": self.error,
+            "profile": str(self.profile_path) if self.profile_path else None,
+        }
+
+    def markdown(self) -> str:
+        """Stage table for the debug panel."""
+        total = self.seconds or 1e-9
+        rows = []
+        for name, seconds in self.stages.items():
+            if "/" not in name:
+                rows.append((name, seconds))
+                rows += [item for item in self.stages.items() if item[0].startswith(f"{name}/")]
+        rows.append(("other", self.other_seconds))
+        lines = [
+            f"`{self.id}` {self.from_code} -> {self.to_code}",
+            "",
+            "| Stage | ms | % |",
+            "|---|---:|---:|",
+        ]
+        for name, seconds in rows:
+            label = f"&nbsp;&nbsp;{name.split('/', 1)[1]}" if "/" in name else name
+            lines.append(f"| {label} | {seconds * 1000:.1f} | {seconds / total:.0%} |")
+        lines.append(f"| **total** | **{self.seconds * 1000:.1f}** | |")
+        if self.profile_path is not None:
+            lines += ["", f"Profile: `{self.profile_path}`"]
+        return "\n".join(lines)
+
+
+def _save_profile(trace: RequestTrace, profile: cProfile.Profile) -> Path | None:
+    directory = get_state_dir() / "profiles"
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(trace.started))
+    path = directory / f"{stamp}-{trace.from_code}-{trace.to_code}-{trace.id}.prof"
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        profile.dump_stats(path)
+        for old in sorted(directory.glob("*.prof"))[:-_PROFILES_KEPT]:
+            old.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"[trace] Saving profile failed: {e}", file=sys.stderr)
+        return None
+    return path
+
+
+def current_trace() -> RequestTrace | None:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Add the time spent in the enclosed code to the current trace's stage ``name``."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    # Entered now so stages are listed in the order they started (parents first)
+    trace.stages.setdefault(name, 0.0)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start)
+
+
+@contextmanager
+def trace_request(kind: str, from_code: str = "", to_code: str = "") -> Iterator[RequestTrace]:
+    """Trace one request; nested calls join the enclosing trace."""
+    outer = _current.get()
+    if outer is not None:
+        yield outer
+        return
+    trace = RequestTrace(kind, from_code, to_code)
+    try:
+        with trace.active():
+            yield trace
+    except Exception as e:
+        trace.error = str(e)
+        raise
+    finally:
+        trace.finish()
+
+
+# Most recent finished traces, newest last
+recent_traces: deque[RequestTrace] = deque(maxlen=200)
@@ -0,0 +1,400 @@
+"""Segment-level translation memory with a MinHash index for near matches.
+
+Every sentence the batched engine path translates is stored with its
+translation in a SQLite file in the XDG state directory. Lookups first try an
+exact match on the normalized sentence and then a fuzzy match: sentences are
+reduced to character trigrams, summarized by a MinHash signature and bucketed
+by locality-sensitive hashing, so only a handful of candidates are compared
+(by trigram Jaccard similarity) instead of the whole memory. Matches at or
+above ``ARGOS_TM_THRESHOLD`` percent similarity are used without running the
+model. Sentences translated by the model are tagged with the package version
+and inference settings that produced them and only match while those are
+current; imported sentences match under any version. Memories can be imported
+from and exported to JSONL or TMX.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import defaultdict
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO
+from xml.etree import ElementTree
+
+from config import Config, get_state_dir
+from result_cache import normalize_text
+
+SHINGLE_SIZE = 3
+BANDS = 8
+ROWS_PER_BAND = 4
+NUM_HASHES = BANDS * ROWS_PER_BAND
+_PRIME = (1 << 61) - 1
+# Fixed seeds so signatures stay comparable between runs
+_SEEDS = [
+    ((i * 0x9E3779B97F4A7C15 + 1) % _PRIME, (i * 0xC2B2AE3D27D4EB4F + 7) % _PRIME)
+    for i in range(1, NUM_HASHES + 1)
+]
+_XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+
+def shingles(text: str) -> set[str]:
+    """Character trigrams of the lowercased, whitespace-normalized text."""
+    text = " ".join(normalize_text(text).lower().split())
+    if len(text) <= SHINGLE_SIZE:
+        return {text}
+    return {text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash(grams: set[str]) -> list[int]:
+    """MinHash signature of a shingle set (NUM_HASHES values)."""
+    hashes = [zlib.crc32(gram.encode("utf-8")) for gram in grams]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _SEEDS]
+
+
+def band_keys(signature: list[int]) -> list[tuple[int, int]]:
+    """LSH buckets of a signature; similar sentences share at least one with high probability."""
+    return [
+        (band, hash(tuple(signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND])))
+        for band in range(BANDS)
+    ]
+
+
+@dataclass
+class MemoryMatch:
+    """A stored translation for a sentence and how similar its source is (1.0 = exact)."""
+
+    source: str
+    target: str
+    score: float
+
+
+class _PairIndex:
+    """Exact and MinHash lookups over the entries of one language pair."""
+
+    def __init__(self) -> None:
+        self.exact: dict[str, int] = {}
+        self.entries: dict[int, tuple[str, str]] = {}
+        self.buckets: dict[tuple[int, int], list[int]] = defaultdict(list)
+
+    def add(
+        self, entry_id: int, source: str, target: str, bands: list[tuple[int, int]] | None = None
+    ) -> None:
+        key = normalize_text(source)
+        previous = self.exact.get(key)
+        if previous is not None:
+            # Updated translation of a known source: the buckets are unchanged
+            self.entries[previous] = (source, target)
+            return
+        self.exact[key] = entry_id
+        self.entries[entry_id] = (source, target)
+        for band in bands if bands is not None else band_keys(minhash(shingles(source))):
+            self.buckets[band].append(entry_id)
+
+    def lookup(self, sentence: str, threshold: float) -> MemoryMatch | None:
+        entry_id = self.exact.get(normalize_text(sentence))
+        if entry_id is not None:
+            source, target = self.entries[entry_id]
+            return MemoryMatch(source, target, 1.0)
+        if threshold >= 1.0 or not self.entries:
+            return None
+        grams = shingles(sentence)
+        candidates = {
+            candidate
+            for band in band_keys(minhash(grams))
+            for candidate in self.buckets.get(band, ())
+        }
+        best: MemoryMatch | None = None
+        for candidate in candidates:
+            source, target = self.entries[candidate]
+            score = jaccard(grams, shingles(source))
+            if score >= threshold and (best is None or score > best.score):
+                best = MemoryMatch(source, target, score)
+        return best
+
+
+class TranslationMemory:
+    """SQLite-backed sentence pairs with in-memory indexes built per pair on first use."""
+
+    def __init__(self, path: Path, threshold: float):
+        self.path = path
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self._indexes: dict[tuple[str, str, str], _PairIndex] = {}
+        self.exact_hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, force: bool = False) -> TranslationMemory | None:
+        """Build the memory from ``Config``; None when it is disabled unless ``force``."""
+        if not Config.TM_ENABLED and not force:
+            return None
+        return cls(
+            get_state_dir() / "translation_memory.sqlite3",
+            threshold=min(100, max(1, Config.TM_THRESHOLD)) / 100,
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS segments (
+                    id INTEGER PRIMARY KEY,
+                    from_code TEXT NOT NULL,
+                    to_code TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    origin TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    bands TEXT NOT NULL,
+                    version TEXT NOT NULL DEFAULT '',
+                    UNIQUE (from_code, to_code, source)
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(segments)")}
+            if "version" not in columns:
+                # Model output from before versioning cannot be matched to a package
+                conn.execute("ALTER TABLE segments ADD COLUMN version TEXT NOT NULL DEFAULT ''")
+                conn.execute("DELETE FROM segments WHERE origin='model'")
+                conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _index(self, from_code: str, to_code: str, version: str) -> _PairIndex:
+        # Caller holds self._lock; version '' rows (imports) belong to every version
+        key = (from_code, to_code, version)
+        index = self._indexes.get(key)
+        if index is None:
+            index = _PairIndex()
+            rows = self._connect().execute(
+                "SELECT id, source, target, bands FROM segments "
+                "WHERE from_code=? AND to_code=? AND version IN (?, '') ORDER BY id",
+                key,
+            )
+            # Stored LSH buckets make building the index a read instead of rehashing
+            for entry_id, source, target, bands in rows:
+                keys = [int(value) for value in bands.split(",")]
+                index.add(entry_id, source, target, list(enumerate(keys)))
+            self._indexes[key] = index
+        return index
+
+    def lookup(
+        self, from_code: str, to_code: str, sentence: str, version: str = ""
+    ) -> MemoryMatch | None:
+        """Return the closest stored translation at or above the threshold.
+
+        Only imported entries and model output of ``version`` are considered.
+        """
+        try:
+            with self._lock:
+                index = self._index(from_code, to_code, version)
+                match = index.lookup(sentence, self.threshold)
+        except sqlite3.Error as e:
+            print(f"[memory] Translation memory read failed: {e}", file=sys.stderr)
+            return None
+        if match is None:
+            self.misses += 1
+        elif match.score >= 1.0:
+            self.exact_hits += 1
+        else:
+            self.fuzzy_hits += 1
+        return match
+
+    def add(
+        self,
+        from_code: str,
+        to_code: str,
+        pairs: Iterable[tuple[str, str]],
+        origin: str = "model",
+        version: str = "",
+    ) -> int:
+        """Store (source, target) sentence pairs; returns how many were written.
+
+        ``version`` tags model output with the package version and settings that
+        produced it; entries without one match under every version.
+        """
+        count = 0
+        try:
+            with self._lock:
+                conn = self._connect()
+                # Indexes of other versions may hold rows overwritten below
+                for key in [key for key in self._indexes if key[:2] == (from_code, to_code)]:
+                    if key[2] != version or not version:
+                        del self._indexes[key]
+                index = self._index(from_code, to_code, version)
+                now = time.time()
+                for source, target in pairs:
+                    source, target = source.strip(), target.strip()
+                    if not source or not target:
+                        continue
+                    bands = band_keys(minhash(shingles(source)))
+                    conn.execute(
+                        "INSERT INTO segments "
+                        "(from_code, to_code, source, target, origin, created, bands, version) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT (from_code, to_code, source) DO UPDATE SET "
+                        "target=excluded.target, origin=excluded.origin, "
+                        "created=excluded.created, version=excluded.version",
+                        (
+                            from_code,
+                            to_code,
+                            source,
+                            target,
+                            origin,
+                            now,
+                            ",".join(str(key) for _band, key in bands),
+                            version,
+                        ),
+                    )
+                    entry_id = conn.execute(
+                        "SELECT id FROM segments WHERE from_code=? AND to_code=? AND source=?",
+                        (from_code, to_code, source),
+                    ).fetchone()[0]
+                    index.add(entry_id, source, target, bands)
+                    count += 1
+                conn.commit()
+        except sqlite3.Error as e:
+            print(f"[memory] Translation memory write failed: {e}", file=sys.stderr)
+        return count
+
+    def entries(
+        self, from_code: str | None = None, to_code: str | None = None
+    ) -> Iterator[tuple[str, str, str, str]]:
+        """Yield (from_code, to_code, source, target) rows, optionally for one pair."""
+        query = "SELECT from_code, to_code, source, target FROM segments"
+        params: tuple = ()
+        if from_code and to_code:
+            query += " WHERE from_code=? AND to_code=?"
+            params = (from_code, to_code)
+        with self._lock:
+            rows = self._connect().execute(query + " ORDER BY id", params).fetchall()
+        yield from rows
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM segments")
+            conn.commit()
+            self._indexes.clear()
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM segments").fetchone()[0]
+        return {
+            "entries": entries,
+            "exact_hits": self.exact_hits,
+            "fuzzy_hits": self.fuzzy_hits,
+            "misses": self.misses,
+        }
+
+
+def _lang_code(tag: str) -> str:
+    """Reduce a TMX language tag such as ``en-US`` to the Argos code ``en``."""
+    return tag.replace("_", "-").split("-")[0].lower()
+
+
+def read_jsonl(
+    stream: IO[str], from_code: str | None, to_code: str | None
+) -> Iterator[tuple[str, str, str, str]]:
+    """Parse ``{"from", "to", "source", "target"}`` lines; codes default to the arguments."""
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            pair = (record.get("from") or from_code, record.get("to") or to_code)
+            source, target = record["source"], record["target"]
+        except (ValueError, KeyError, AttributeError) as e:
+            raise ValueError(f"line {number}: expected source and target fields ({e})") from e
+        if not pair[0] or not pair[1]:
+            raise ValueError(f"line {number}: no language pair (set from/to or --from/--to)")
+        yield pair[0], pair[1], source, target
+
+
+def read_tmx(
+    stream: IO[bytes], from_code: str | None, to_code: str | None
+) -> Iterator[tuple[str, str, str, str]]:
+    """Parse translation units of a TMX file.
+
+    Without ``from_code``/``to_code`` the header's ``srclang`` (or, for
+    ``*all*``, the first language of each unit) is paired with every other
+    language of the unit.
+    """
+    srclang = from_code
+    for event, element in ElementTree.iterparse(stream, events=("start", "end")):
+        if event == "start" and element.tag == "header" and srclang is None:
+            tag = element.get("srclang", "")
+            srclang = _lang_code(tag) if tag and tag != "*all*" else None
+        if event != "end" or element.tag != "tu":
+            continue
+        segments = {}
+        for tuv in element.iter("tuv"):
+            seg = tuv.find("seg")
+            lang = tuv.get(_XML_LANG) or tuv.get("lang")
+            if seg is not None and lang:
+                segments[_lang_code(lang)] = "".join(seg.itertext())
+        element.clear()
+        source_lang = srclang or next(iter(segments), None)
+        if source_lang not in segments:
+            continue
+        targets = [to_code] if to_code else [lang for lang in segments if lang != source_lang]
+        for target_lang in targets:
+            if target_lang in segments:
+                yield source_lang, target_lang, segments[source_lang], segments[target_lang]
+
+
+def write_jsonl(rows: Iterable[tuple[str, str, str, str]], stream: IO[str]) -> int:
+    count = 0
+    for from_code, to_code, source, target in rows:
+        record = {"from": from_code, "to": to_code, "source": source, "target": target}
+        stream.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def write_tmx(rows: Iterable[tuple[str, str, str, str]], stream: IO[bytes]) -> int:
+    """Write TMX 1.4; each row becomes one translation unit."""
+    root = ElementTree.Element("tmx", version="1.4")
+    ElementTree.SubElement(
+        root,
+        "header",
+        creationtool="cindergrace-argos",
+        creationtoolversion="1",
+        segtype="sentence",
+        datatype="plaintext",
+        adminlang="en",
+        srclang="*all*",
+        **{"o-tmf": "cindergrace-argos"},
+    )
+    body = ElementTree.SubElement(root, "body")
+    count = 0
+    for from_code, to_code, source, target in rows:
+        tu = ElementTree.SubElement(body, "tu")
+        for lang, text in ((from_code, source), (to_code, target)):
+            tuv = ElementTree.SubElement(tu, "tuv", {_XML_LANG: lang})
+            ElementTree.SubElement(tuv, "seg").text = text
+        count += 1
+    ElementTree.indent(root)
+    ElementTree.ElementTree(root).write(stream, encoding="utf-8", xml_declaration=True)
+    return count
+
+
+translation_memory = TranslationMemory.from_config()
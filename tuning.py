@@ -0,0 +1,177 @@
+"""CTranslate2 inference settings, configurable globally and per language pair.
+
+Settings are merged from lowest to highest precedence:
+
+1. built-in defaults (the values the engine always used),
+2. global settings saved by ``cindergrace-argos autotune`` in the state file,
+3. ``ARGOS_INTER_THREADS``, ``ARGOS_INTRA_THREADS``, ``ARGOS_COMPUTE_TYPE``,
+   ``ARGOS_BEAM_SIZE`` and ``ARGOS_MAX_DECODING_LENGTH``,
+4. per-pair settings saved by ``autotune --per-pair``,
+5. per-pair overrides from ``ARGOS_PAIR_TUNING`` (JSON, ``{"en:de": {"beam_size": 2}}``).
+
+Thread counts and the compute type take effect when a model is loaded, the
+beam size and decoding length on the next translation.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields, replace
+
+from config import Config, state_store
+
+# Compute types CTranslate2 accepts on every device ("default" keeps the model's own)
+COMPUTE_TYPES = ("default", "auto", "int8", "int8_float32", "int16", "float32", "float16")
+
+
+@dataclass(frozen=True)
+class InferenceSettings:
+    """Model load and decoding options for one language pair."""
+
+    inter_threads: int = 1
+    intra_threads: int = 0  # 0 lets CTranslate2 pick
+    compute_type: str = "default"
+    beam_size: int = 4
+    max_decoding_length: int = 256
+
+    def model_options(self) -> dict[str, object]:
+        """Keyword arguments for ``ctranslate2.Translator``."""
+        return {
+            "inter_threads": self.inter_threads,
+            "intra_threads": self.intra_threads,
+            "compute_type": self.compute_type,
+        }
+
+    def decoding_options(self) -> dict[str, object]:
+        """Keyword arguments for ``Translator.translate_batch``."""
+        return {"beam_size": self.beam_size, "max_decoding_length": self.max_decoding_length}
+
+    def cache_tag(self) -> str:
+        """Part of the result cache version; only options that change the output."""
+        return f"{self.compute_type}/b{self.beam_size}/l{self.max_decoding_length}"
+
+    def __str__(self) -> str:
+        return (
+            f"{self.compute_type}, {self.inter_threads}x{self.intra_threads or 'auto'} threads, "
+            f"beam {self.beam_size}, max length {self.max_decoding_length}"
+        )
+
+
+_FIELDS = {field.name for field in fields(InferenceSettings)}
+
+
+def _validated(values: dict, source: str) -> dict[str, object]:
+    """Keep the known, well-typed keys of ``values``; report the rest to stderr."""
+    valid: dict[str, object] = {}
+    for key, value in values.items():
+        if key not in _FIELDS:
+            print(f"[tuning] {source}: unknown setting '{key}'", file=sys.stderr)
+        elif key == "compute_type":
+            if value in COMPUTE_TYPES:
+                valid[key] = value
+            else:
+                print(f"[tuning] {source}: unknown compute type '{value}'", file=sys.stderr)
+        elif isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+            if key in ("beam_size", "max_decoding_length", "inter_threads") and value == 0:
+                print(f"[tuning] {source}: {key} must be at least 1", file=sys.stderr)
+            else:
+                valid[key] = value
+        else:
+            print(f"[tuning] {source}: invalid value for {key}: {value!r}", file=sys.stderr)
+    return valid
+
+
+def _env_settings() -> dict[str, object]:
+    values = {
+        "inter_threads": Config.INTER_THREADS,
+        "intra_threads": Config.INTRA_THREADS,
+        "compute_type": Config.COMPUTE_TYPE,
+        "beam_size": Config.BEAM_SIZE,
+        "max_decoding_length": Config.MAX_DECODING_LENGTH,
+    }
+    return _validated({k: v for k, v in values.items() if v is not None}, "environment")
+
+
+def _env_pair_settings() -> dict[str, dict]:
+    if not Config.PAIR_TUNING:
+        return {}
+    try:
+        pairs = json.loads(Config.PAIR_TUNING)
+        if not isinstance(pairs, dict):
+            raise ValueError("expected an object keyed by 'from:to'")
+    except ValueError as e:
+        print(f"[tuning] Ignoring ARGOS_PAIR_TUNING: {e}", file=sys.stderr)
+        return {}
+    return {
+        pair: _validated(values, f"ARGOS_PAIR_TUNING[{pair}]")
+        for pair, values in pairs.items()
+        if isinstance(values, dict)
+    }
+
+
+class InferenceTuning:
+    """Resolves the effective ``InferenceSettings`` per pair."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._global: dict[str, object] = {}
+        self._pairs: dict[str, dict] = {}
+        self._override: InferenceSettings | None = None
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        saved = state_store.load().get("inference") or {}
+        saved_pairs = saved.get("pairs") or {}
+        env_pairs = _env_pair_settings()
+        self._global = {**_validated(saved.get("global") or {}, "state"), **_env_settings()}
+        self._pairs = {
+            pair: {
+                **_validated(saved_pairs.get(pair) or {}, f"state[{pair}]"),
+                **env_pairs.get(pair, {}),
+            }
+            for pair in set(saved_pairs) | set(env_pairs)
+        }
+        self._loaded = True
+
+    def settings(self, from_code: str, to_code: str) -> InferenceSettings:
+        """Return the settings used for the model of ``from_code -> to_code``."""
+        with self._lock:
+            if self._override is not None:
+                return self._override
+            self._ensure_loaded()
+            values = {**self._global, **self._pairs.get(f"{from_code}:{to_code}", {})}
+        return replace(InferenceSettings(), **values)
+
+    def reload(self) -> None:
+        """Re-read the state file and environment on the next lookup."""
+        with self._lock:
+            self._loaded = False
+
+    @contextmanager
+    def override(self, settings: InferenceSettings) -> Iterator[None]:
+        """Use ``settings`` for every pair while the block runs (for autotuning)."""
+        with self._lock:
+            previous, self._override = self._override, settings
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._override = previous
+
+    def save(self, settings: InferenceSettings, pair: str | None = None) -> None:
+        """Persist autotuned settings globally or for one ``from:to`` pair."""
+        saved = dict(state_store.load().get("inference") or {})
+        if pair is None:
+            saved["global"] = asdict(settings)
+        else:
+            saved["pairs"] = {**(saved.get("pairs") or {}), pair: asdict(settings)}
+        state_store.update({"inference": saved})
+        self.reload()
+
+
+inference_tuning = InferenceTuning()
@@ -0,0 +1,253 @@
+"""Pool of translation worker processes.
+
+Each worker is a separate process with its own resident models, so
+concurrent translations use several cores instead of contending for the GIL
+in the Gradio worker threads. Requests are routed to a worker that already
+has the language pair loaded whenever one is not busy.
+"""
+from __future__ import annotations
+
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+# Set in worker processes so the engine never starts a nested pool
+_in_worker = False
+
+# A worker that already has the pair loaded is preferred while it has fewer queued jobs
+_AFFINITY_MAX_PENDING = 2
+
+
+def _worker_main(worker_id: int, threads: int, requests, results) -> None:
+    """Serve translation jobs until a stop message arrives."""
+    global _in_worker
+    _in_worker = True
+    if threads > 0:
+        os.environ.setdefault("OMP_NUM_THREADS", str(threads))
+
+    import engine
+    from config import Config
+
+    if threads > 0:
+        engine.ct2_options["intra_threads"] = threads
+    # Requests are already micro-batched in the parent process
+    Config.MICROBATCH_WAIT_MS = 0
+
+    while True:
+        job_id, op, payload = requests.get()
+        if op == "stop":
+            break
+        if op == "invalidate":
+            engine.translator_registry.invalidate()
+            continue
+        try:
+            if op == "text":
+                text, from_code, to_code = payload
+                value = engine.translate_uncached(text, from_code, to_code)
+            elif op == "sentences":
+                sentences, from_code, to_code, max_batch_tokens = payload
+                report = engine.BatchReport()
+                translation = engine.translator_registry.get(from_code, to_code)
+                translated = engine.translate_sentences(
+                    translation, sentences, max_batch_tokens, report
+                )
+                value = (translated, report.batches)
+            else:
+                raise ValueError(f"Unknown worker operation: {op}")
+            results.put((job_id, worker_id, True, value))
+        except engine.NoPackageError as e:
+            results.put((job_id, worker_id, False, ("no_package", e.from_lang, e.to_lang)))
+        except Exception as e:
+            results.put((job_id, worker_id, False, ("error", f"{type(e).__name__}: {e}")))
+
+
+class _Worker:
+    def __init__(self, worker_id: int, process, requests):
+        self.id = worker_id
+        self.process = process
+        self.requests = requests
+        self.pending: set[int] = set()
+        self.loaded_pairs: set[tuple[str, str]] = set()
+
+
+class WorkerPool:
+    """Dispatches translation jobs to worker processes with pair affinity."""
+
+    def __init__(self, size: int, threads_per_worker: int = 1):
+        self.size = size
+        self.threads_per_worker = threads_per_worker
+        # spawn: forking a process that runs web server threads is not safe
+        self._ctx = multiprocessing.get_context("spawn")
+        self._results = self._ctx.Queue()
+        self._lock = threading.Lock()
+        self._futures: dict[int, tuple[Future, tuple[str, str]]] = {}
+        self._job_ids = itertools.count()
+        self._workers = [self._spawn(i) for i in range(size)]
+        self._running = True
+        self._collector = threading.Thread(
+            target=self._collect, name="argos-worker-results", daemon=True
+        )
+        self._collector.start()
+        print(
+            f"[pool] Started {size} workers with {threads_per_worker} threads each",
+            file=sys.stderr,
+        )
+
+    def _spawn(self, worker_id: int) -> _Worker:
+        requests = self._ctx.Queue()
+        process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker_id, self.threads_per_worker, requests, self._results),
+            name=f"argos-worker-{worker_id}",
+            daemon=True,
+        )
+        process.start()
+        return _Worker(worker_id, process, requests)
+
+    def _pick(self, pair: tuple[str, str]) -> _Worker:
+        # Caller holds self._lock
+        warm = [w for w in self._workers if pair in w.loaded_pairs]
+        if warm:
+            best = min(warm, key=lambda w: len(w.pending))
+            if len(best.pending) < _AFFINITY_MAX_PENDING:
+                return best
+        return min(self._workers, key=lambda w: (len(w.pending), len(w.loaded_pairs)))
+
+    def _submit(
+        self, op: str, payload, pair: tuple[str, str], worker_index: int | None = None
+    ) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if not self._running:
+                raise RuntimeError("Worker pool is shut down")
+            job_id = next(self._job_ids)
+            worker = self._pick(pair) if worker_index is None else self._workers[worker_index]
+            worker.pending.add(job_id)
+            self._futures[job_id] = (future, pair)
+        worker.requests.put((job_id, op, payload))
+        return future
+
+    def translate_text(self, text: str, from_code: str, to_code: str) -> str:
+        """Translate a text in a worker and wait for the result."""
+        pair = (from_code, to_code)
+        return self._submit("text", (text, from_code, to_code), pair).result()
+
+    def warm(self, text: str, from_code: str, to_code: str) -> None:
+        """Translate ``text`` in every worker, so each one has the pair loaded."""
+        pair = (from_code, to_code)
+        futures = [
+            self._submit("text", (text, from_code, to_code), pair, worker_index=i)
+            for i in range(self.size)
+        ]
+        for future in futures:
+            future.result()
+
+    def translate_sentences(
+        self, sentences: list[str], from_code: str, to_code: str, max_batch_tokens: int
+    ) -> tuple[list[str], int]:
+        """Translate sentences in a worker; returns the results and the batch count."""
+        payload = (sentences, from_code, to_code, max_batch_tokens)
+        return self._submit("sentences", payload, (from_code, to_code)).result()
+
+    def _collect(self) -> None:
+        from engine import NoPackageError
+
+        last_reap = time.monotonic()
+        while self._running:
+            if time.monotonic() - last_reap >= 1.0:
+                self._reap_dead_workers()
+                last_reap = time.monotonic()
+            try:
+                job_id, worker_id, ok, value = self._results.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                worker = self._workers[worker_id]
+                worker.pending.discard(job_id)
+                job = self._futures.pop(job_id, None)
+                if job is not None and ok:
+                    worker.loaded_pairs.add(job[1])
+            if job is None:
+                continue
+            future = job[0]
+            if ok:
+                future.set_result(value)
+            elif value[0] == "no_package":
+                future.set_exception(NoPackageError(value[1], value[2]))
+            else:
+                future.set_exception(RuntimeError(value[1]))
+
+    def _reap_dead_workers(self) -> None:
+        """Fail the jobs of crashed workers and replace them."""
+        with self._lock:
+            for i, worker in enumerate(self._workers):
+                if worker.process.is_alive() or not self._running:
+                    continue
+                print(
+                    f"[pool] Worker {worker.id} exited ({worker.process.exitcode}), restarting",
+                    file=sys.stderr,
+                )
+                for job_id in worker.pending:
+                    job = self._futures.pop(job_id, None)
+                    if job is not None:
+                        job[0].set_exception(RuntimeError("Translation worker crashed"))
+                self._workers[i] = self._spawn(worker.id)
+
+    def invalidate(self) -> None:
+        """Tell every worker to drop its resident models after package changes."""
+        with self._lock:
+            for worker in self._workers:
+                worker.loaded_pairs.clear()
+                worker.requests.put((-1, "invalidate", None))
+
+    def stats(self) -> list[dict[str, object]]:
+        with self._lock:
+            return [
+                {
+                    "worker": w.id,
+                    "alive": w.process.is_alive(),
+                    "pending": len(w.pending),
+                    "pairs": sorted(f"{f}->{t}" for f, t in w.loaded_pairs),
+                }
+                for w in self._workers
+            ]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._running = False
+            for worker in self._workers:
+                worker.requests.put((-1, "stop", None))
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+
+
+_pool: WorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool | None:
+    """Return the process-wide pool, starting it on first use (None if disabled)."""
+    global _pool
+    if _in_worker:
+        return None
+    from config import Config
+
+    if Config.WORKERS <= 0:
+        return None
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool(Config.WORKERS, Config.THREADS_PER_WORKER)
+        return _pool
+
+
+def invalidate_workers() -> None:
+    """Invalidate resident models in running workers (no-op without a pool)."""
+    if _pool is not None:
+        _pool.invalidate()